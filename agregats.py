@@ -0,0 +1,113 @@
+import threading
+from bisect import bisect_left, insort
+
+# ==========================================
+# AGRÉGATS DU JOURNAL (MAINTENUS INCRÉMENTALEMENT)
+# ==========================================
+
+
+class Agregats:
+    """Compteurs, paliers de notes et file d'écoute, calculés une fois puis mis à jour ligne à ligne.
+
+    Toutes les listes contiennent des dates (index du DataFrame), triées par date :
+    l'interface relit les lignes avec `df.loc[dates]`, sans balayer tout le frame.
+    """
+
+    def __init__(self, df, version):
+        self.version = version
+        self.total = len(df)
+        self.a_ecouter = []                          # File d'écoute (non validés)
+        self.decouvertes = {}                        # Validés, pas déjà connus : note -> dates
+        self.classiques = {}                         # Validés, déjà connus : note -> dates
+        self._etat = {}                              # date -> (ecoute, deja_connu, note)
+        self._verrou = threading.Lock()
+
+        etats = zip(df.index, df['ecoute'], df['deja_connu'], df['note'])
+        for date, ecoute, connu, note in sorted(etats):
+            self._ajouter(date, (bool(ecoute), bool(connu), int(note)), trie=False)
+
+    # --- MAINTENANCE ---
+    def _seau(self, etat):
+        ecoute, connu, note = etat
+        if not ecoute:
+            return self.a_ecouter
+        paliers = self.classiques if connu else self.decouvertes
+        return paliers.setdefault(note, [])
+
+    def _ajouter(self, date, etat, trie=True):
+        self._etat[date] = etat
+        seau = self._seau(etat)
+        if trie:
+            insort(seau, date)
+        else:
+            seau.append(date)  # Construction initiale : dates déjà triées
+
+    def _retirer(self, date):
+        etat = self._etat.pop(date, None)
+        if etat is not None:
+            seau = self._seau(etat)
+            i = bisect_left(seau, date)
+            if i < len(seau) and seau[i] == date:
+                del seau[i]
+
+    def appliquer(self, df, dates, version):
+        """Reporte les lignes `dates` de `df` (après une écriture) et passe à `version`."""
+        with self._verrou:
+            for date in dates:
+                self._retirer(date)
+                if date in df.index:
+                    ligne = df.loc[date]
+                    self._ajouter(date, (bool(ligne['ecoute']), bool(ligne['deja_connu']), int(ligne['note'])))
+            self.total = len(df)
+            self.version = version
+
+    # --- LECTURE ---
+    @property
+    def nb_valides(self):
+        return self.total - len(self.a_ecouter)
+
+    @property
+    def nb_decouvertes(self):
+        return sum(len(dates) for dates in self.decouvertes.values())
+
+    @property
+    def nb_classiques(self):
+        return sum(len(dates) for dates in self.classiques.values())
+
+    def prochains(self, n):
+        """Les `n` prochaines dates à écouter, dans l'ordre."""
+        with self._verrou:
+            return self.a_ecouter[:n]
+
+    def decouvertes_note(self, note):
+        """Dates des découvertes ayant cette note."""
+        with self._verrou:
+            return list(self.decouvertes.get(note, []))
+
+    def classiques_par_note(self):
+        """Dates des classiques, note décroissante puis date."""
+        with self._verrou:
+            return [date for note in sorted(self.classiques, reverse=True) for date in self.classiques[note]]
+
+
+_verrou = threading.Lock()
+_courant = None
+
+
+def pour_version(df, version):
+    """Agrégats de la version demandée : réutilise ceux du processus, sinon reconstruit."""
+    global _courant
+    with _verrou:
+        if _courant is None or _courant.version != version:
+            _courant = Agregats(df, version)
+        return _courant
+
+
+def appliquer(df, dates, version_avant, version):
+    """Met à jour les agrégats après une écriture, s'ils correspondent à `version_avant`.
+
+    Sinon (écriture concurrente, première exécution...) ils seront reconstruits au prochain chargement.
+    """
+    with _verrou:
+        if _courant is not None and _courant.version == version_avant:
+            _courant.appliquer(df, dates, version)
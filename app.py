@@ -1,12 +1,21 @@
 import streamlit as st
 import pandas as pd
-import json
-import requests
-import wikipedia
-import time
 from datetime import date, datetime
-from streamlit_calendar import calendar
-from streamlit_gsheets import GSheetsConnection
+from stockage import JournalSheet, charger_journal
+from stockage_local import MIN_LIGNES_FEUILLE, ConflitEcriture, JournalLocal
+import caches
+import metadonnees
+import resumes_wiki
+import vues
+import agregats
+import recherche
+import pochettes
+import mesures
+import echanges
+from metadonnees import get_albums_infos
+
+# Trace de ce rerun (durées, appels, caches) : voir le panneau de performances en fin de script
+mesures.demarrer("rerun")
 
 # ==========================================
 # 1. CONFIGURATION & DESIGN "CULTURE FUSION"
@@ -96,105 +105,208 @@ st.markdown("""
 # ==========================================
 # 2. GESTION DES DONNÉES (ROBUSTE)
 # ==========================================
-conn = st.connection("gsheets", type=GSheetsConnection)
+def connexion_sheets():
+    """Connexion Google Sheets, ouverte au premier accès à la feuille (thread de synchro).
+
+    Ni l'import de st-gsheets-connection ni la connexion ne retardent le premier rendu.
+    """
+    from streamlit_gsheets import GSheetsConnection
+    return st.connection("gsheets", type=GSheetsConnection)
 
+@st.cache_resource
+def get_journal_local():
+    """Copie SQLite partagée par le processus, synchronisée en fond avec la feuille."""
+    local = JournalLocal(JournalSheet(connexion_sheets, worksheet="Database"))
+    local.demarrer()
+    return local
+
+@mesures.mesure("journal.load_data")
 def load_data():
-    """Charge les données, gère les types et initialise les colonnes manquantes."""
+    """Charge les données depuis la copie locale, gère les types et initialise les colonnes manquantes.
+
+    Retourne (df, version) : la version sert de clé aux vues dérivées mises en cache.
+    """
     try:
-        df = conn.read(worksheet="Database", ttl=0)
-        
-        # 1. Initialisation si vide (Fallback JSON)
-        if df.empty or len(df) < 10:
+        # Frame partagé par toutes les sessions (un seul par version, jamais modifié en place)
+        local = get_journal_local()
+        df, version, updated = local.instantane()
+
+        # 1. Première exécution : journal initial affiché tout de suite, la feuille est lue
+        #    en arrière-plan (elle remplace cette copie dès qu'elle arrive, voir JournalLocal.amorcer)
+        if len(df) < MIN_LIGNES_FEUILLE:
             try:
-                with open("journal_musical_ULTIMATE.json", 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                df = pd.DataFrame.from_dict(data, orient='index').reset_index().rename(columns={'index': 'date'})
-                conn.update(worksheet="Database", data=df)
-                st.cache_data.clear()
+                local.amorcer(charger_journal())
             except FileNotFoundError:
-                st.error("Fichier JSON introuvable. Veuillez vérifier le dépôt.")
-                return pd.DataFrame()
-        
-        # 2. Vérification et Création des colonnes
-        expected_cols = {
-            'ecoute': False, 
-            'note': 0, 
-            'avis': "", 
-            'deja_connu': False, 
-            'pays': "🌍"
-        }
-        updated = False
-        for col, default_val in expected_cols.items():
-            if col not in df.columns:
-                df[col] = default_val
-                updated = True
-        
-        # 3. Nettoyage strict des types (Anti-Bug Pandas)
-        df['ecoute'] = df['ecoute'].fillna(False).infer_objects(copy=False).astype(bool)
-        df['deja_connu'] = df['deja_connu'].fillna(False).infer_objects(copy=False).astype(bool)
-        df['note'] = pd.to_numeric(df['note'], errors='coerce').fillna(0).astype(int)
-        
-        # Conversion texte sécurisée
-        if 'avis' in df.columns:
-            df['avis'] = df['avis'].astype(str).replace('nan', '')
-        if 'pays' in df.columns:
-            df['pays'] = df['pays'].astype(str).replace('nan', '🌍')
+                # Pas de journal initial : il faut attendre la feuille
+                if local.pull().empty:
+                    st.error("Fichier JSON introuvable. Veuillez vérifier le dépôt.")
+                    return pd.DataFrame(), None
+            df, version, updated = local.instantane()
 
-        # 4. Sauvegarde si structure modifiée
+        # 2. Sauvegarde si structure modifiée (colonne ajoutée)
         if updated:
-            conn.update(worksheet="Database", data=df)
-            st.cache_data.clear()
+            local.replace(df)
+            df, version, updated = local.instantane()
             
-        return df
+        return df, version
     except Exception as e:
         st.error(f"Erreur critique lors du chargement : {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), None
+
+# Pochettes/années : cache persistant sur disque (voir metadonnees.py), jamais vidé par une notation
+@st.cache_resource
+def importer_enrichissement():
+    """Pochettes / années du journal généré versées une fois par processus dans le cache iTunes.
+
+    Le frame affiché vient de la feuille, qui n'a pas ces colonnes : elles sont retrouvées par album.
+    """
+    try:
+        return metadonnees.cache().importer_enrichissement(charger_journal())
+    except FileNotFoundError:
+        return 0
+
+importer_enrichissement()
+caches.enregistrer(caches.METADONNEES, metadonnees.cache().vider_memoire)
+caches.enregistrer(caches.WIKIPEDIA, resumes_wiki.cache().vider_memoire)
 
-def save_data(df):
-    """Sauvegarde les données dans Google Sheets."""
+@mesures.mesure("journal.save_data")
+def save_data(changements):
+    """Enregistre localement `changements` ({date: {colonne: valeur}}) ; la feuille suit en arrière-plan.
+
+    Écriture conditionnelle : si une ligne a été modifiée depuis que l'utilisateur l'a vue
+    (autre appareil, édition de la feuille), rien n'est écrit. Retourne True si l'écriture a eu lieu.
+    """
     try:
-        conn.update(worksheet="Database", data=df)
-        st.cache_data.clear()
+        local = get_journal_local()
+        if local.provisoire:
+            notifier("Journal en cours de chargement depuis Google Sheets : réessaie dans un instant.", "⏳")
+            return False
+        revs = st.session_state.get('revs_affichees', {})
+        dates, version = local.modifier(changements, {d: revs.get(d, 0) for d in changements})
+        # Agrégats mis à jour pour les seules lignes modifiées (pas de rescan du frame), si le frame
+        # partagé est bien celui de cette écriture ; sinon (modification externe adoptée entre-temps)
+        # ils sont reconstruits au prochain chargement par `pour_version`
+        nouveau, version_instantane, _ = local.instantane()
+        if version_instantane == version:
+            agregats.appliquer(nouveau, dates, version - 1, version)
+        caches.invalider_notes()
+        return True
+    except ConflitEcriture:
+        notifier("Album modifié entre-temps sur un autre appareil : voici sa dernière version.", "⚠️")
+        return False
     except Exception as e:
         st.error(f"Erreur de sauvegarde : {e}")
+        return False
 
-@st.cache_data
-def get_album_infos(artiste, album):
-    """Récupère pochette et année via iTunes API avec image par défaut."""
-    # Image par défaut (Vinyle propre)
-    default_cover = "https://upload.wikimedia.org/wikipedia/commons/thumb/b/b6/12in-Vinyl-LP-Record-Angle.jpg/640px-12in-Vinyl-LP-Record-Angle.jpg"
-    infos = {"cover": default_cover, "year": ""}
-    
-    try:
-        # Recherche iTunes
-        term = f"{artiste} {album}"
-        url = f"https://itunes.apple.com/search?term={term}&entity=album&limit=1"
-        res = requests.get(url, timeout=3).json()
-        
-        if res['resultCount'] > 0:
-            data = res['results'][0]
-            # On prend la grande image (600x600)
-            infos["cover"] = data.get('artworkUrl100', default_cover).replace("100x100", "600x600")
-            infos["year"] = data.get('releaseDate', "")[:4]
-    except:
-        pass # En cas d'erreur (pas de réseau, etc), on garde l'image par défaut
-        
-    return infos
+# ==========================================
+# 3. GALERIE (FRAGMENTS PAR MOIS)
+# ==========================================
+TAILLE_PAGE_GALERIE = 12  # Cartes affichées par page (3 lignes de 4)
+
+def _page_suivante(cle_page):
+    st.session_state[cle_page] = st.session_state.get(cle_page, 1) + 1
+
+@st.fragment
+@mesures.mesure("rendu.galerie_mois")
+def afficher_mois_galerie(cle_mois, libelle, df_month, ouvert_par_defaut):
+    """Un mois de la galerie : rien n'est rendu (ni pochette demandée) tant qu'il est fermé.
+
+    Ouvrir un mois ou charger la page suivante ne ré-exécute que ce fragment.
+    """
+    ouvert = st.toggle(f"📅 {libelle} ({len(df_month)})", value=ouvert_par_defaut, key=f"galerie_{cle_mois}")
+    if not ouvert:
+        return
+
+    cle_page = f"galerie_pages_{cle_mois}"
+    nb_visibles = st.session_state.get(cle_page, 1) * TAILLE_PAGE_GALERIE
+    visibles = df_month.head(nb_visibles)
+    # Pochettes de la page résolues en un lot (requêtes parallèles)
+    infos_galerie = get_albums_infos(visibles)
+    # Miniatures locales (téléchargées et réduites une seule fois)
+    images = pochettes.cache().servir_lot([i['cover'] for i in infos_galerie.values()], "moyenne")
+
+    cols = st.columns(4)
+    for i, row in enumerate(visibles.to_dict('records')):
+        with cols[i % 4]:
+            info_art = infos_galerie[(row['artiste'], row['album'])]
+            with st.container(border=True):
+                st.image(images.get(info_art['cover'], info_art['cover']), width="stretch")
+                st.markdown(f"**{row['pays']} {row['artiste']}**")
+                # Badge Statut
+                if row['ecoute']:
+                    if row['deja_connu']:
+                        st.markdown("<span class='badge-status' style='background:#17a2b8; color:white'>Classique</span>", unsafe_allow_html=True)
+                    else:
+                        st.markdown("<span class='badge-status' style='background:#28a745; color:white'>Découverte</span>", unsafe_allow_html=True)
+                else:
+                    st.caption(f"📅 {row['date']}")
+
+    restants = len(df_month) - nb_visibles
+    if restants > 0:
+        st.button(f"Voir plus ({restants} restants)", key=f"plus_{cle_mois}", on_click=_page_suivante, args=(cle_page,))
 
 # ==========================================
-# 3. LOGIQUE & INTERFACE
+# 4. NOTIFICATIONS (NON BLOQUANTES)
 # ==========================================
-df = load_data()
+def notifier(message, icone, ballons=False):
+    """Programme un toast pour le prochain rerun (un st.rerun() immédiat l'effacerait)."""
+    st.session_state['notification'] = (message, icone, ballons)
 
-if not df.empty:
-    
-    # --- HEADER & KPI ---
-    nb_valide = df[df['ecoute'] == True].shape[0]
-    total = len(df)
+@st.fragment(run_every="10s")
+def afficher_etat_synchro():
+    """Écritures en attente / synchronisées : rafraîchi seul, sans relancer l'app.
+
+    Si le journal a changé depuis le dernier rendu (autre session, édition de la feuille),
+    toute l'app est relancée pour l'afficher.
+    """
+    local = get_journal_local()
+    vue = st.session_state.get('version_affichee')
+    if vue is not None and local.version() != vue:
+        notifier("Journal mis à jour depuis un autre appareil", "🔄")
+        st.rerun()
+    etat = local.etat()
+    if etat["en_attente"] and etat["erreur"]:
+        delai = max(0, int((etat["prochain_essai"] or 0) - datetime.now().timestamp()))
+        st.warning(f"⚠️ {etat['en_attente']} modification(s) en attente : Google Sheets injoignable, "
+                   f"nouvel essai dans {delai} s. Rien n'est perdu.")
+    elif etat["en_attente"]:
+        st.caption(f"⏳ {etat['en_attente']} modification(s) en cours d'envoi vers Google Sheets")
+    elif etat["derniere_synchro"]:
+        heure = datetime.fromtimestamp(etat["derniere_synchro"]).strftime("%H:%M")
+        st.caption(f"✅ Synchronisé avec Google Sheets ({heure})")
+
+@st.fragment(run_every="2s")
+def attendre_feuille():
+    """Affiché tant que la copie locale est provisoire : relance l'app dès que la feuille est lue."""
+    if not get_journal_local().provisoire:
+        st.rerun()
+    st.info("⏳ Chargement du journal depuis Google Sheets... Les notes s'afficheront dans un instant "
+            "(enregistrement possible une fois le chargement terminé).")
+
+def afficher_notification():
+    notification = st.session_state.pop('notification', None)
+    if notification:
+        message, icone, ballons = notification
+        st.toast(message, icon=icone)
+        if ballons:
+            st.balloons()
+
+# ==========================================
+# 5. BLOCS DE L'INTERFACE
+# ==========================================
+# Chaque bloc interactif est un fragment : ses interactions (choix d'album, vue du calendrier,
+# article Wikipédia, pagination...) ne ré-exécutent que lui. Seules les écritures relancent
+# toute l'app, dont les calculs lourds sont en cache par version des données.
+
+@mesures.mesure("rendu.entete")
+def afficher_entete(ag):
+    # --- HEADER & KPI (lus dans les agrégats, sans scan du frame) ---
+    nb_valide = ag.nb_valides
+    total = ag.total
     
     # Stats détaillées
-    nb_decouvertes = df[(df['ecoute'] == True) & (df['deja_connu'] == False)].shape[0]
-    nb_classiques = df[(df['ecoute'] == True) & (df['deja_connu'] == True)].shape[0]
+    nb_decouvertes = ag.nb_decouvertes
+    nb_classiques = ag.nb_classiques
     
     st.title("🎹 Odyssée Musicale 2026")
     
@@ -210,251 +322,379 @@ if not df.empty:
     c2.metric("🟢 Découvertes", nb_decouvertes)
     c3.metric("🔵 Classiques", nb_classiques)
 
+@st.fragment
+@mesures.mesure("rendu.sidebar")
+def afficher_editeur_sidebar(df, ag, data_version):
     # --- SIDEBAR (Recherche Avancée) ---
-    with st.sidebar:
-        st.header("🔍 Rechercher & Noter")
-        st.caption("Accès rapide pour noter un album.")
-        
-        # Création d'une liste formatée pour le menu
-        # On stocke l'index original pour le retrouver facilement
-        options_dict = {f"{r['pays']} {r['artiste']} - {r['album']}": i for i, r in df.iterrows()}
+    st.header("🔍 Rechercher & Noter")
+    st.caption("Accès rapide pour noter un album.")
+    
+    # Index (artiste, album, genre, tag, pays) construit une fois par version des données :
+    # sans accents, par préfixe et tolérant aux fautes. Seuls les meilleurs résultats sont envoyés.
+    requete = st.text_input("Artiste, album, genre...", placeholder="ex : kendrik, daft, rap fr")
+    if requete.strip():
+        dates = recherche.pour_version(df, data_version).chercher(requete)
+    else:
+        dates = ag.prochains(recherche.NB_RESULTATS)  # Par défaut : les prochains albums
+    
+    if requete.strip() and not dates:
+        st.caption("Aucun album trouvé.")
+    
+    # Les options sont les dates (index du DataFrame) : accès direct à la ligne
+    idx_sel = st.selectbox(
+        "Choisir un album", [None] + dates,
+        format_func=lambda d: "-- Sélectionner --" if d is None
+        else f"{df.at[d, 'pays']} {df.at[d, 'artiste']} - {df.at[d, 'album']}"
+    )
+    
+    if idx_sel is not None:
+        row_sel = df.loc[idx_sel]
         
-        choix = st.selectbox("Choisir un album", ["-- Sélectionner --"] + list(options_dict.keys()))
+        st.divider()
+        st.write(f"**{row_sel['album']}**")
         
-        if choix != "-- Sélectionner --":
-            # On récupère l'index direct via le dictionnaire (Plus robuste que le split string)
-            idx_sel = options_dict[choix]
-            row_sel = df.loc[idx_sel]
+        with st.form(f"sidebar_form_{idx_sel}"):
+            # Pré-remplissage intelligent
+            current_note = int(row_sel['note']) if row_sel['note'] > 0 else 5
             
-            st.divider()
-            st.write(f"**{row_sel['album']}**")
+            s_note = st.slider("Note", 1, 5, current_note)
+            s_avis = st.text_area("Avis", value=row_sel['avis'])
+            s_connu = st.checkbox("Déjà connu (Classique)", value=row_sel['deja_connu'])
+            s_pays = st.text_input("Drapeau", value=row_sel['pays'])
             
-            with st.form(f"sidebar_form_{idx_sel}"):
-                # Pré-remplissage intelligent
-                current_note = int(row_sel['note']) if row_sel['note'] > 0 else 5
+            if st.form_submit_button("💾 Enregistrer"):
+                if save_data({idx_sel: {
+                    'ecoute': True, 'note': s_note, 'avis': s_avis, 'deja_connu': s_connu, 'pays': s_pays
+                }}):
+                    notifier("Modifications enregistrées !", "✅")
+                st.rerun()
+
+@st.fragment
+@mesures.mesure("rendu.player")
+def afficher_player(df, ag):
+    # File d'écoute ordonnée (agrégats) : seuls les prochains albums sont relus
+    df_todo = df.loc[ag.prochains(1 + resumes_wiki.JOURS_PRECHARGES)]
+    
+    if not df_todo.empty:
+        current = df_todo.iloc[0]
+        # Index du dataframe principal = date : accès direct, sans scan
+        real_idx = current['date']
+        
+        # Infos API (album du jour + celui de demain en un lot)
+        infos_player = get_albums_infos(df_todo.head(2))
+        infos = infos_player[(current['artiste'], current['album'])]
+        images = pochettes.cache().servir_lot([i['cover'] for i in infos_player.values()], "moyenne")
+        
+        # Affichage Principal
+        st.markdown(f"## {current['pays']} {current['artiste']}")
+        st.markdown(f"#### *{current['album']}* ({infos['year']})")
+        
+        # Image + Cadre
+        st.image(images.get(infos["cover"], infos["cover"]), width=320)
+        
+        # Wikipédia (Replié) : lecture du cache local uniquement, téléchargement à la demande.
+        # Les prochains jours sont préchargés en arrière-plan.
+        resumes = resumes_wiki.cache()
+        resumes.precharger(df_todo[['artiste', 'album']].head(1 + resumes_wiki.JOURS_PRECHARGES).itertuples(index=False, name=None))
+        with st.expander("📖 Histoire & Anecdotes"):
+            trouve = resumes.entree(current['artiste'], current['album'])
+            if trouve is None and st.button("Charger l'article Wikipédia", key="btn_wiki"):
+                trouve = resumes.resoudre(current['artiste'], current['album'])
+            if trouve is None:
+                st.caption("Article en cours de préchargement...")
+            else:
+                resume, statut = trouve
+                if statut == "ok":
+                    st.info("💡 **Le saviez-vous ?**")
+                    st.write(resume['summary'][:700] + "...")
+                    st.markdown(f"[Lire l'article complet]({resume['url']})")
+                elif statut == "absent":
+                    st.warning("Pas d'article Wikipédia trouvé.")
+                else:
+                    st.write("Connexion Wikipédia indisponible.")
+
+        st.divider()
+
+        # Zone de Notation
+        with st.container(border=True):
+            with st.form("main_notation_form"):
+                st.write("### 🎙️ Ton verdict")
+                
+                c_note, c_pays = st.columns([3, 1])
+                with c_note:
+                    val_note = st.feedback("stars")
+                with c_pays:
+                    val_pays = st.text_input("Pays", value=current['pays'], help="Mets un emoji drapeau ici !")
                 
-                s_note = st.slider("Note", 1, 5, current_note)
-                s_avis = st.text_area("Avis", value=row_sel['avis'])
-                s_connu = st.checkbox("Déjà connu (Classique)", value=row_sel['deja_connu'])
-                s_pays = st.text_input("Drapeau", value=row_sel['pays'])
+                val_avis = st.text_area("Ta critique", height=100, placeholder="Production, flow, émotion...")
+                val_connu = st.checkbox("Je connaissais déjà cet album (Classique)")
                 
-                if st.form_submit_button("💾 Enregistrer"):
-                    df.at[idx_sel, 'ecoute'] = True
-                    df.at[idx_sel, 'note'] = s_note
-                    df.at[idx_sel, 'avis'] = s_avis
-                    df.at[idx_sel, 'deja_connu'] = s_connu
-                    df.at[idx_sel, 'pays'] = s_pays
-                    save_data(df)
-                    st.toast("Modifications enregistrées !", icon="✅")
-                    time.sleep(1)
+                submit = st.form_submit_button("✅ Valider l'écoute")
+                
+                if submit:
+                    if save_data({real_idx: {
+                        'ecoute': True,
+                        'note': (val_note + 1) if val_note is not None else 3,
+                        'avis': val_avis,
+                        'deja_connu': val_connu,
+                        'pays': val_pays,
+                    }}):
+                        notifier("Album validé avec succès !", "🎉", ballons=True)
                     st.rerun()
-
-    # --- NAVIGATION ---
-    tab1, tab2, tab3, tab4 = st.tabs(["🎧 À l'écoute", "📅 Calendrier", "🏆 Découvertes", "🔄 Classiques"])
-
-    # ==========================================
-    # TAB 1 : LE PLAYER
-    # ==========================================
-    with tab1:
-        df_todo = df[df['ecoute'] == False].sort_values('date')
         
-        if not df_todo.empty:
-            current = df_todo.iloc[0]
-            # Récupération de l'index réel dans le dataframe principal
-            real_idx = df[df['date'] == current['date']].index[0]
-            
-            # Infos API
-            infos = get_album_infos(current['artiste'], current['album'])
+        # TEASING DU LENDEMAIN
+        if len(df_todo) > 1:
+            next_up = df_todo.iloc[1]
+            next_infos = infos_player[(next_up['artiste'], next_up['album'])]
             
-            # Affichage Principal
-            st.markdown(f"## {current['pays']} {current['artiste']}")
-            st.markdown(f"#### *{current['album']}* ({infos['year']})")
+            st.markdown(f"""
+            <div class='next-album-card'>
+                <p style='color:#FF8200; margin:0; font-weight:bold; letter-spacing: 2px; font-size: 0.8em;'>🔜 DEMAIN</p>
+                <img src='{pochettes.en_data_uri(images.get(next_infos['cover'], next_infos['cover']))}' class='next-album-cover'>
+                <h3 style='margin:5px 0; font-size: 1.2em;'>{next_up['pays']} {next_up['artiste']}</h3>
+                <p style='color:#aaa; font-style:italic; margin:0;'>{next_up['album']}</p>
+            </div>
+            """, unsafe_allow_html=True)
             
-            # Image + Cadre
-            st.image(infos["cover"], width=320)
-            
-            # Wikipédia (Replié)
-            with st.expander("📖 Histoire & Anecdotes"):
-                try:
-                    wikipedia.set_lang("fr")
-                    res_wiki = wikipedia.search(f"{current['album']} {current['artiste']}")
-                    if res_wiki:
-                        page = wikipedia.page(res_wiki[0])
-                        st.info("💡 **Le saviez-vous ?**")
-                        st.write(page.summary[:700] + "...")
-                        st.markdown(f"[Lire l'article complet]({page.url})")
-                    else:
-                        st.warning("Pas d'article Wikipédia trouvé.")
-                except:
-                    st.write("Connexion Wikipédia indisponible.")
+    else:
+        st.success("🏆 INCROYABLE ! Tu as terminé le challenge 2026 !")
+        st.balloons()
+
+@st.fragment
+@mesures.mesure("rendu.calendrier")
+def afficher_calendrier(df, data_version):
+    view_mode = st.radio("Vue :", ["Liste 📱", "Grille 🖥️", "Galerie 🖼️"], horizontal=True, label_visibility="collapsed")
+    
+    if view_mode == "Galerie 🖼️":
+        st.caption("Ta collection classée par mois.")
+        # Un seul groupby (en cache par version) ; chaque mois est un fragment indépendant
+        mois_courant = date.today().strftime('%Y-%m')
+        for cle_mois, libelle, df_month in vues.galerie_par_mois(df, data_version):
+            afficher_mois_galerie(cle_mois, libelle, df_month, cle_mois == mois_courant)
+    else:
+        # Mode Calendrier (Liste/Grille) : événements en cache par version + date du jour
+        events = vues.evenements_calendrier(df, data_version, str(date.today()))
+        
+        # Import différé : le composant n'est chargé qu'au premier calendrier affiché
+        from streamlit_calendar import calendar
+        cal_mode = "listMonth" if "Liste" in view_mode else "dayGridMonth"
+        calendar(events=events, options={
+            "initialDate": "2026-01-01",
+            "locale": "fr",
+            "headerToolbar": {"left": "prev,next", "center": "title", "right": ""},
+            "initialView": cal_mode,
+            "height": "600px"
+        }, key=f"cal_{view_mode}")
 
-            st.divider()
+@st.fragment
+@mesures.mesure("rendu.decouvertes")
+def afficher_decouvertes(df, ag):
+    st.caption("🟢 Tes nouvelles découvertes de l'année.")
+    
+    if ag.nb_decouvertes == 0:
+        st.info("Aucune découverte validée pour l'instant.")
+    else:
+        tiers = [(5, "S-TIER", "🚨"), (4, "A-TIER", "🟠"), (3, "B-TIER", "🟡"), (2, "C-TIER", "🟢"), (1, "D-TIER", "🟤")]
+        paliers = {note: df.loc[ag.decouvertes_note(note)] for note, _, _ in tiers}
+        # Toute la liste est rendue d'un coup : pochettes manquantes résolues en arrière-plan
+        # (image par défaut en attendant) plutôt que d'attendre iTunes pour chaque album noté
+        infos_green = get_albums_infos(pd.concat(paliers.values()), attendre=False)
+        images = pochettes.cache().servir_lot([i['cover'] for i in infos_green.values()], "mini", attendre=False)
+        for note, label, icon in tiers:
+            sub_df = paliers[note]
+            if not sub_df.empty:
+                st.subheader(f"{icon} {label}")
+                for r_idx, row in sub_df.iterrows():
+                    with st.expander(f"{row['pays']} {row['artiste']} - {row['album']}"):
+                        c_img, c_txt = st.columns([1, 3])
+                        with c_img:
+                            inf = infos_green[(row['artiste'], row['album'])]
+                            st.image(images.get(inf['cover'], inf['cover']), width=100)
+                        with c_txt:
+                            st.write(f"**Avis :** {row['avis']}")
+                            if st.button("Passer en 'Classique' (Bleu)", key=f"btn_blue_{r_idx}"):
+                                if save_data({r_idx: {'deja_connu': True}}):
+                                    notifier("Album passé en Classique", "🔵")
+                                st.rerun()
 
-            # Zone de Notation
-            with st.container(border=True):
-                with st.form("main_notation_form"):
-                    st.write("### 🎙️ Ton verdict")
-                    
-                    c_note, c_pays = st.columns([3, 1])
-                    with c_note:
-                        val_note = st.feedback("stars")
-                    with c_pays:
-                        val_pays = st.text_input("Pays", value=current['pays'], help="Mets un emoji drapeau ici !")
-                    
-                    val_avis = st.text_area("Ta critique", height=100, placeholder="Production, flow, émotion...")
-                    val_connu = st.checkbox("Je connaissais déjà cet album (Classique)")
-                    
-                    submit = st.form_submit_button("✅ Valider l'écoute")
-                    
-                    if submit:
-                        df.at[real_idx, 'ecoute'] = True
-                        df.at[real_idx, 'note'] = (val_note + 1) if val_note is not None else 3
-                        df.at[real_idx, 'avis'] = val_avis
-                        df.at[real_idx, 'deja_connu'] = val_connu
-                        df.at[real_idx, 'pays'] = val_pays
-                        save_data(df)
-                        
-                        st.toast("Album validé avec succès !", icon="🎉")
-                        st.balloons()
-                        time.sleep(1.5)
+@st.fragment
+@mesures.mesure("rendu.classiques")
+def afficher_classiques(df, ag):
+    st.caption("🔵 Tes classiques et relectures.")
+    # Déjà triés par note décroissante dans les agrégats
+    df_blue = df.loc[ag.classiques_par_note()]
+    
+    if df_blue.empty:
+        st.info("Rien ici.")
+    else:
+        infos_blue = get_albums_infos(df_blue, attendre=False)
+        images = pochettes.cache().servir_lot([i['cover'] for i in infos_blue.values()], "mini", attendre=False)
+        for r_idx, row in df_blue.iterrows():
+            with st.expander(f"🔵 {row['pays']} {'⭐'*row['note']} | {row['artiste']} - {row['album']}"):
+                c_img, c_txt = st.columns([1, 3])
+                with c_img:
+                    inf = infos_blue[(row['artiste'], row['album'])]
+                    st.image(images.get(inf['cover'], inf['cover']), width=100)
+                with c_txt:
+                    st.write(f"**Avis :** {row['avis']}")
+                    if st.button("Passer en 'Découverte' (Vert)", key=f"btn_green_{r_idx}"):
+                        if save_data({r_idx: {'deja_connu': False}}):
+                            notifier("Album passé en Découverte", "🟢")
                         st.rerun()
-            
-            # TEASING DU LENDEMAIN
-            if len(df_todo) > 1:
-                next_up = df_todo.iloc[1]
-                next_infos = get_album_infos(next_up['artiste'], next_up['album'])
-                
-                st.markdown(f"""
-                <div class='next-album-card'>
-                    <p style='color:#FF8200; margin:0; font-weight:bold; letter-spacing: 2px; font-size: 0.8em;'>🔜 DEMAIN</p>
-                    <img src='{next_infos['cover']}' class='next-album-cover'>
-                    <h3 style='margin:5px 0; font-size: 1.2em;'>{next_up['pays']} {next_up['artiste']}</h3>
-                    <p style='color:#aaa; font-style:italic; margin:0;'>{next_up['album']}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-        else:
-            st.success("🏆 INCROYABLE ! Tu as terminé le challenge 2026 !")
-            st.balloons()
 
-    # ==========================================
+@st.fragment
+@mesures.mesure("rendu.import_export")
+def afficher_import_export(df, data_version):
+    """Notes par lot (CSV / JSON fusionné par date, aperçu avant écriture) et export du journal."""
+    with st.expander("📥 Import / 📤 Export"):
+        fichier = st.file_uploader("Importer des notes", type=list(echanges.FORMATS), key="import_notes",
+                                   help="Colonne `date` + au choix : ecoute, note, avis, deja_connu, pays")
+        if fichier is not None:
+            try:
+                changements, erreurs, apercu = echanges.fusionner(echanges.lire_fichier(fichier.name, fichier.getvalue()), df)
+            except echanges.ErreurImport as e:
+                st.error(f"Fichier illisible : {e}")
+            else:
+                if erreurs:
+                    st.warning(f"{len(erreurs)} ligne(s) ignorée(s) :\n\n" + "\n".join(f"- {e}" for e in erreurs))
+                if not changements:
+                    st.info("Aucune modification par rapport au journal.")
+                else:
+                    st.dataframe(apercu, hide_index=True, width="stretch")
+                    # Tout le lot : une seule écriture locale, un seul envoi vers la feuille
+                    if st.button(f"✅ Appliquer ({len(changements)} album(s))", key="import_appliquer"):
+                        if save_data(changements):
+                            notifier(f"{len(changements)} album(s) mis à jour", "📥")
+                        st.rerun()
+
+        c_csv, c_json = st.columns(2)
+        for col, format in ((c_csv, "csv"), (c_json, "json")):
+            with col:
+                st.download_button(
+                    f"📤 {format.upper()}", echanges.exporter(df, data_version, format),
+                    file_name=f"journal_musical.{format}", on_click="ignore", width="stretch"
+                )
+
+@st.fragment
+@mesures.mesure("rendu.statistiques")
+def afficher_statistiques(df, data_version):
+    """Tableaux et courbes calculés par groupby dans vues.py (en cache par version) : aucune boucle ici."""
+    st.caption("📊 Ton année en chiffres.")
+    aujourd_hui = str(date.today())
+    progression = vues.progression_mensuelle(df, data_version, aujourd_hui)
+
+    c_prog, c_retard = st.columns(2)
+    with c_prog:
+        st.markdown("#### 📈 Progression")
+        st.line_chart(
+            progression[['ecoutes_cumul', 'prevus_cumul']].rename(columns={'ecoutes_cumul': "Écoutés", 'prevus_cumul': "Prévus"}),
+            color=["#28a745", "#6c757d"]
+        )
+    with c_retard:
+        st.markdown("#### ⚠️ Albums en retard")
+        st.area_chart(progression['retard'].dropna().rename("En retard"), color="#dc3545")
+
+    st.markdown("#### ⭐ Répartition des notes")
+    st.bar_chart(vues.distribution_notes(df, data_version), color=["#28a745", "#17a2b8"], stack=False)
+
+    dimensions = [libelle for libelle, col in vues.DIMENSIONS.items() if col in df.columns]
+    libelle = st.radio("Par :", dimensions, horizontal=True, key="stats_dimension")
+    stats = vues.stats_par(df, data_version, vues.DIMENSIONS[libelle])
+    st.dataframe(
+        stats.drop(columns='decouvertes'),
+        width="stretch",
+        column_config={
+            "albums": st.column_config.NumberColumn("Albums"),
+            "ecoutes": st.column_config.NumberColumn("Écoutés"),
+            "note_moyenne": st.column_config.NumberColumn("Note moyenne", format="%.1f ⭐"),
+            "part_decouvertes": st.column_config.ProgressColumn("Découvertes", format="percent", min_value=0, max_value=1),
+        }
+    )
+
+# ==========================================
+# 6. PERFORMANCES (PANNEAU DE DÉBOGAGE)
+# ==========================================
+def debogage_actif():
+    """Panneau visible avec `?debug=perf` dans l'URL, ou `debug_perf = true` dans les secrets."""
+    if st.query_params.get("debug") == "perf":
+        return True
+    try:
+        return bool(st.secrets.get("debug_perf", False))
+    except Exception:  # Pas de fichier de secrets
+        return False
+
+def afficher_performances():
+    """Clôt la trace du rerun ; en mode débogage, l'exporte (JSON lines) et l'affiche."""
+    trace = mesures.terminer()
+    if trace is None or not debogage_actif():
+        return
+    mesures.exporter([trace])
+
+    with st.sidebar.expander("⏱️ Performances", expanded=False):
+        st.metric("Dernier rerun", f"{trace['duree_ms']:.0f} ms")
+        etapes = pd.DataFrame.from_dict(trace['etapes'], orient='index')
+        if not etapes.empty:
+            st.dataframe(etapes.sort_values('ms', ascending=False), width="stretch")
+        caches_rerun = pd.DataFrame.from_dict(trace['caches'], orient='index')
+        if not caches_rerun.empty:
+            st.caption("Caches (succès / échecs)")
+            st.dataframe(caches_rerun, width="stretch")
+
+        # Historique : reruns complets et reruns de fragments
+        historique = list(mesures.historique)
+        st.caption(f"{len(historique)} dernières traces")
+        st.line_chart(pd.DataFrame({'ms': [t['duree_ms'] for t in historique]}), height=120)
+        st.download_button(
+            "📥 Exporter (JSON lines)", mesures.en_jsonl(historique),
+            file_name="mesures.jsonl", mime="application/x-ndjson"
+        )
+
+# ==========================================
+# 7. LOGIQUE & INTERFACE
+# ==========================================
+df, data_version = load_data()
+# Révisions des lignes affichées au rendu précédent : base des écritures conditionnelles
+# (un formulaire validé l'est sur ce que l'utilisateur a vu, pas sur le frame relu à l'instant)
+st.session_state.setdefault('revs_affichees', df.attrs.get('revs', {}))
+# Version rendue par cette session : un changement venu d'ailleurs déclenche un rerun (voir afficher_etat_synchro)
+st.session_state['version_affichee'] = data_version
+afficher_notification()
+
+if not df.empty:
+    if get_journal_local().provisoire:
+        attendre_feuille()
+    ag = agregats.pour_version(df, data_version)
+    afficher_entete(ag)
+
+    with st.sidebar:
+        afficher_etat_synchro()
+        afficher_editeur_sidebar(df, ag, data_version)
+        afficher_import_export(df, data_version)
+
+    # --- NAVIGATION ---
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🎧 À l'écoute", "📅 Calendrier", "🏆 Découvertes", "🔄 Classiques", "📊 Statistiques"])
+
+    # TAB 1 : LE PLAYER
+    with tab1:
+        afficher_player(df, ag)
+
     # TAB 2 : CALENDRIER & GALERIE
-    # ==========================================
     with tab2:
-        view_mode = st.radio("Vue :", ["Liste 📱", "Grille 🖥️", "Galerie 🖼️"], horizontal=True, label_visibility="collapsed")
-        
-        if view_mode == "Galerie 🖼️":
-            st.caption("Ta collection classée par mois.")
-            # Conversion date pour tri
-            df['dt_obj'] = pd.to_datetime(df['date'])
-            # On parcourt les mois de 1 à 12
-            for month_num in range(1, 13):
-                df_month = df[df['dt_obj'].dt.month == month_num]
-                
-                if not df_month.empty:
-                    month_name = df_month.iloc[0]['dt_obj'].strftime('%B %Y').capitalize()
-                    
-                    with st.expander(f"📅 {month_name}", expanded=(month_num == date.today().month)):
-                        cols = st.columns(4)
-                        for i, (_, row) in enumerate(df_month.iterrows()):
-                            with cols[i % 4]:
-                                info_art = get_album_infos(row['artiste'], row['album'])
-                                with st.container(border=True):
-                                    st.image(info_art['cover'], use_container_width=True)
-                                    st.markdown(f"**{row['pays']} {row['artiste']}**")
-                                    # Badge Statut
-                                    if row['ecoute']:
-                                        if row['deja_connu']:
-                                            st.markdown("<span class='badge-status' style='background:#17a2b8; color:white'>Classique</span>", unsafe_allow_html=True)
-                                        else:
-                                            st.markdown("<span class='badge-status' style='background:#28a745; color:white'>Découverte</span>", unsafe_allow_html=True)
-                                    else:
-                                        st.caption(f"📅 {row['date']}")
-        else:
-            # Mode Calendrier (Liste/Grille)
-            events = []
-            today_iso = str(date.today())
-            
-            for _, r in df.iterrows():
-                evt_title = f"{r['pays']} {r['artiste']}"
-                
-                if r['ecoute']:
-                    if r['deja_connu']:
-                        color, title = "#17a2b8", f"🔄 {evt_title}" # Bleu
-                    else:
-                        color, title = "#28a745", f"✅ {evt_title}" # Vert
-                elif str(r['date']) < today_iso:
-                    color, title = "#dc3545", f"⚠️ {evt_title}" # Rouge
-                else:
-                    color, title = "#6c757d", f"🎵 {evt_title}" # Gris
-                
-                events.append({
-                    "title": title, 
-                    "start": str(r['date']), 
-                    "allDay": True, 
-                    "backgroundColor": color, 
-                    "borderColor": color
-                })
-            
-            cal_mode = "listMonth" if "Liste" in view_mode else "dayGridMonth"
-            calendar(events=events, options={
-                "initialDate": "2026-01-01",
-                "locale": "fr",
-                "headerToolbar": {"left": "prev,next", "center": "title", "right": ""},
-                "initialView": cal_mode,
-                "height": "600px"
-            }, key=f"cal_{view_mode}")
-
-    # ==========================================
+        afficher_calendrier(df, data_version)
+
     # TAB 3 : TIER LIST (DÉCOUVERTES - VERT)
-    # ==========================================
     with tab3:
-        st.caption("🟢 Tes nouvelles découvertes de l'année.")
-        df_green = df[(df['ecoute'] == True) & (df['deja_connu'] == False)]
-        
-        if df_green.empty:
-            st.info("Aucune découverte validée pour l'instant.")
-        else:
-            tiers = [(5, "S-TIER", "🚨"), (4, "A-TIER", "🟠"), (3, "B-TIER", "🟡"), (2, "C-TIER", "🟢"), (1, "D-TIER", "🟤")]
-            for note, label, icon in tiers:
-                sub_df = df_green[df_green['note'] == note]
-                if not sub_df.empty:
-                    st.subheader(f"{icon} {label}")
-                    for _, row in sub_df.iterrows():
-                        r_idx = df[df['date'] == row['date']].index[0]
-                        with st.expander(f"{row['pays']} {row['artiste']} - {row['album']}"):
-                            c_img, c_txt = st.columns([1, 3])
-                            with c_img:
-                                inf = get_album_infos(row['artiste'], row['album'])
-                                st.image(inf['cover'], width=100)
-                            with c_txt:
-                                st.write(f"**Avis :** {row['avis']}")
-                                if st.button("Passer en 'Classique' (Bleu)", key=f"btn_blue_{r_idx}"):
-                                    df.at[r_idx, 'deja_connu'] = True
-                                    save_data(df)
-                                    st.rerun()
-
-    # ==========================================
+        afficher_decouvertes(df, ag)
+
     # TAB 4 : CLASSIQUES (RELECTURES - BLEU)
-    # ==========================================
     with tab4:
-        st.caption("🔵 Tes classiques et relectures.")
-        df_blue = df[(df['ecoute'] == True) & (df['deja_connu'] == True)]
-        
-        if df_blue.empty:
-            st.info("Rien ici.")
-        else:
-            # Tri par note décroissante
-            for _, row in df_blue.sort_values('note', ascending=False).iterrows():
-                r_idx = df[df['date'] == row['date']].index[0]
-                with st.expander(f"🔵 {row['pays']} {'⭐'*row['note']} | {row['artiste']} - {row['album']}"):
-                    c_img, c_txt = st.columns([1, 3])
-                    with c_img:
-                        inf = get_album_infos(row['artiste'], row['album'])
-                        st.image(inf['cover'], width=100)
-                    with c_txt:
-                        st.write(f"**Avis :** {row['avis']}")
-                        if st.button("Passer en 'Découverte' (Vert)", key=f"btn_green_{r_idx}"):
-                             df.at[r_idx, 'deja_connu'] = False
-                             save_data(df)
-                             st.rerun()
\ No newline at end of file
+        afficher_classiques(df, ag)
+
+    # TAB 5 : STATISTIQUES (GENRES, TAGS, PAYS, ARTISTES, MOIS)
+    with tab5:
+        afficher_statistiques(df, data_version)
+
+# Rendu complet : les prochaines écritures se comparent aux révisions affichées ici
+st.session_state['revs_affichees'] = df.attrs.get('revs', {})
+
+afficher_performances()
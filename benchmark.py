@@ -0,0 +1,336 @@
+"""Banc d'essai hors ligne de l'app (AppTest + faux Google Sheets / iTunes / Wikipédia).
+
+    python benchmark.py                         # compare à benchmark_reference.json
+    python benchmark.py --enregistrer           # remplace la référence
+    python benchmark.py --tailles 365 --latence-sheets 0.5
+
+Chaque scénario (une taille de journal) tourne dans un sous-processus et un dossier
+temporaire : caches, threads de synchro et copie SQLite repartent de zéro, comme sur un
+conteneur neuf (seuls le journal initial et son instantané sont présents).
+Les durées dépendent de la machine : la référence n'a de sens que sur la même machine.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+from schema import chemin_instantane
+from stockage import FICHIER_JSON
+
+DOSSIER_APP = os.path.dirname(os.path.abspath(__file__))
+FICHIER_REFERENCE = os.path.join(DOSSIER_APP, "benchmark_reference.json")
+
+TAILLES = (365, 1000, 5000)
+LATENCES = {
+    "sheets": 0.3,     # Lecture / écriture de la feuille
+    "itunes": 0.1,     # Recherche d'un album
+    "wikipedia": 0.2,  # Recherche + page
+    "pochette": 0.05,  # Téléchargement d'une image
+}
+
+# Régression : plus lent que la référence de TOLERANCE (relatif) ET de MARGE_MS (absolu)
+TOLERANCE = 0.25
+MARGE_MS = 20
+
+# Budget de démarrage (ms) : premier rendu d'un conteneur neuf (pas de copie locale, caches
+# vides), quelle que soit la taille du journal. Vérifié même sans référence.
+BUDGET_DEMARRAGE_MS = 2500
+
+
+# ==========================================
+# FAUX SERVICES (INSTALLÉS DANS LE SOUS-PROCESSUS)
+# ==========================================
+def journal_factice(nb_lignes):
+    """Journal de `nb_lignes` jours : le catalogue en boucle, ~40 % déjà écoutés et notés."""
+    import pandas as pd
+    from stockage import charger_json
+
+    base = charger_json(os.path.join(DOSSIER_APP, "journal_musical_ULTIMATE.json"))
+    df = base.iloc[[i % len(base) for i in range(nb_lignes)]].reset_index(drop=True)
+    df['date'] = pd.date_range("2026-01-01", periods=nb_lignes).strftime("%Y-%m-%d")
+    df['album'] = [f"{album} #{i // len(base)}" if i >= len(base) else album for i, album in enumerate(df['album'])]
+    ecoute = [i % 5 < 2 for i in range(nb_lignes)]
+    df['ecoute'] = ecoute
+    df['note'] = [(i % 5) + 1 if e else 0 for i, e in enumerate(ecoute)]
+    df['deja_connu'] = [e and i % 3 == 0 for i, e in enumerate(ecoute)]
+    df['avis'] = ""
+    df['pays'] = "🌍"
+    return df
+
+
+def installer_faux_services(nb_lignes, latences):
+    """Remplace GSheetsConnection, iTunes, Wikipédia et le CDN des pochettes par des doublures locales."""
+    import streamlit as st
+    from PIL import Image
+
+    import metadonnees
+    import pochettes
+    import resumes_wiki
+
+    class FeuilleFactice:
+        donnees = journal_factice(nb_lignes)
+
+        class spreadsheet:
+            @staticmethod
+            def get_lastUpdateTime():
+                return "revision-0"
+
+        def batch_update(self, donnees, **kwargs):
+            time.sleep(latences["sheets"])
+
+        def append_rows(self, lignes, **kwargs):
+            time.sleep(latences["sheets"])
+
+    class ClientFactice:
+        def _select_worksheet(self, worksheet):
+            return FeuilleFactice()
+
+    class ConnexionFactice:
+        client = ClientFactice()
+
+        def read(self, worksheet, **kwargs):
+            time.sleep(latences["sheets"])
+            return FeuilleFactice.donnees.copy()
+
+        def update(self, worksheet, data):
+            time.sleep(latences["sheets"])
+            FeuilleFactice.donnees = data.copy()
+
+    def itunes(artiste, album, session=None, timeout=3):
+        time.sleep(latences["itunes"])
+        return {"cover": f"https://pochettes.invalid/{zlib.crc32(f'{artiste}|{album}'.encode())}.jpg", "year": "2000", "itunes_id": 1}
+
+    def wikipedia(artiste, album):
+        time.sleep(latences["wikipedia"])
+        return {"summary": f"{album} est un album de {artiste}. " * 20, "url": "https://fr.wikipedia.org"}
+
+    tampon = io.BytesIO()
+    Image.new("RGB", (600, 600), (40, 40, 40)).save(tampon, "JPEG")
+
+    class ReponseImage:
+        content = tampon.getvalue()
+
+        def raise_for_status(self):
+            pass
+
+    class SessionImages:
+        def get(self, url, timeout=None):
+            time.sleep(latences["pochette"])
+            return ReponseImage()
+
+    st.connection = lambda *args, **kwargs: ConnexionFactice()
+    metadonnees.rechercher_itunes = itunes
+    resumes_wiki.rechercher_wikipedia = wikipedia
+    pochettes.cache().session = SessionImages()
+
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {dossier!r})
+import benchmark
+benchmark.installer_faux_services({nb_lignes}, {latences!r})
+exec(compile(open({app!r}, encoding="utf-8").read(), {app!r}, "exec"))
+"""
+
+
+# ==========================================
+# SCÉNARIO (SOUS-PROCESSUS)
+# ==========================================
+def _chrono(at):
+    debut = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Exception dans l'app : {[e.value for e in at.exception]}")
+    return round((time.perf_counter() - debut) * 1000, 1)
+
+
+def _derniere_trace():
+    import mesures
+    return next(t for t in reversed(mesures.historique) if t["trace"] == "rerun")
+
+
+def _provisoire():
+    """True tant que la copie locale est celle du journal initial (feuille pas encore lue)."""
+    import sqlite3
+    from stockage_local import CHEMIN_DB
+
+    with sqlite3.connect(CHEMIN_DB) as cx:
+        return cx.execute("SELECT 1 FROM etat WHERE cle = 'provisoire'").fetchone() is not None
+
+
+def _lignes_locales():
+    import sqlite3
+    from stockage_local import CHEMIN_DB
+
+    with sqlite3.connect(CHEMIN_DB) as cx:
+        return cx.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+
+
+def _attendre_feuille(delai_max=120):
+    """Attend que le thread de synchro ait remplacé la copie provisoire par la feuille."""
+    limite = time.monotonic() + delai_max
+    while _provisoire():
+        if time.monotonic() > limite:
+            raise RuntimeError(f"Feuille toujours pas lue après {delai_max} s")
+        time.sleep(0.01)
+
+
+def scenario(nb_lignes, latences):
+    """Mesures (ms) d'une session complète sur un journal de `nb_lignes` lignes.
+
+    Démarrage d'un conteneur neuf en deux temps : `premier_rendu` (copie provisoire du journal
+    initial, quelle que soit la taille de la feuille) puis `journal_complet` (depuis le lancement,
+    jusqu'au rendu des `nb_lignes` lignes de la feuille). `rerun` est mesuré ensuite, caches chauds.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    script = SCRIPT.format(dossier=DOSSIER_APP, nb_lignes=nb_lignes, latences=latences,
+                           app=os.path.join(DOSSIER_APP, "app.py"))
+    at = AppTest.from_string(script, default_timeout=3600)
+    resultats = {}
+
+    debut = time.perf_counter()
+    resultats["premier_rendu"] = _chrono(at)
+    _attendre_feuille()
+    resultats["rendu_complet"] = _chrono(at)
+    resultats["journal_complet"] = round((time.perf_counter() - debut) * 1000, 1)
+    if any("Chargement du journal" in info.value for info in at.info) or _lignes_locales() != nb_lignes:
+        raise RuntimeError(f"Journal de {nb_lignes} lignes non affiché après la lecture de la feuille")
+
+    resultats["rerun"] = _chrono(at)
+    # Rendu de chaque onglet dans un rerun complet (étapes tracées, voir mesures.py)
+    for etape, duree in _derniere_trace()["etapes"].items():
+        if etape.startswith("rendu."):
+            resultats[f"onglet.{etape[len('rendu.'):]}"] = duree["ms"]
+
+    # Galerie : premier mois ouvert (pochettes résolues puis réduites)
+    next(r for r in at.radio if "Galerie 🖼️" in r.options).set_value("Galerie 🖼️")
+    resultats["galerie"] = _chrono(at)
+    resultats["galerie_chaude"] = _chrono(at)
+
+    # Notation de l'album du jour (formulaire principal)
+    at.text_area[0].input("Avis du banc d'essai")
+    next(b for b in at.button if "Valider" in str(b.label)).click()
+    resultats["notation"] = _chrono(at)
+    return resultats
+
+
+# ==========================================
+# ORCHESTRATION, RÉFÉRENCE ET RAPPORT
+# ==========================================
+def lancer(nb_lignes, latences, repetitions):
+    """Médiane de `repetitions` sous-processus pour une taille."""
+    series = {}
+    for _ in range(repetitions):
+        dossier = tempfile.mkdtemp(prefix="banc_")
+        for fichier in (FICHIER_JSON, chemin_instantane(FICHIER_JSON)):
+            shutil.copy(os.path.join(DOSSIER_APP, fichier), dossier)
+        try:
+            sortie = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--scenario", str(nb_lignes),
+                 "--latences", json.dumps(latences)],
+                cwd=dossier, capture_output=True, text=True, check=True
+            ).stdout
+        finally:
+            shutil.rmtree(dossier, ignore_errors=True)
+        for mesure, valeur in json.loads(sortie.strip().splitlines()[-1]).items():
+            series.setdefault(mesure, []).append(valeur)
+    return {mesure: statistics.median(valeurs) for mesure, valeurs in series.items()}
+
+
+def comparer(resultats, reference, tolerance=TOLERANCE, marge_ms=MARGE_MS):
+    """Lignes du rapport et liste des régressions."""
+    lignes, regressions = [], []
+    for taille, mesures_taille in resultats.items():
+        lignes.append(f"--- {taille} lignes ---")
+        for mesure, valeur in mesures_taille.items():
+            avant = reference.get(taille, {}).get(mesure)
+            if avant is None:
+                lignes.append(f"  {mesure:<28} {valeur:>9.1f} ms   (nouveau)")
+                continue
+            ecart = (valeur - avant) / avant if avant else 0.0
+            regression = valeur > avant * (1 + tolerance) and valeur - avant > marge_ms
+            marque = "❌" if regression else "✅"
+            lignes.append(f"{marque} {mesure:<28} {valeur:>9.1f} ms   (réf. {avant:.1f} ms, {ecart:+.0%})")
+            if regression:
+                regressions.append((taille, mesure, avant, valeur))
+    return lignes, regressions
+
+
+def verifier_budget(resultats, budget_ms=BUDGET_DEMARRAGE_MS):
+    """Lignes du rapport et tailles dont le premier rendu dépasse le budget."""
+    lignes, depassements = [f"--- Budget de démarrage (premier rendu) : {budget_ms} ms ---"], []
+    for taille, mesures_taille in resultats.items():
+        valeur = mesures_taille["premier_rendu"]
+        ok = valeur <= budget_ms
+        lignes.append(f"{'✅' if ok else '❌'} {taille + ' lignes':<28} {valeur:>9.1f} ms")
+        if not ok:
+            depassements.append((taille, valeur))
+    return lignes, depassements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai hors ligne de l'app Streamlit.")
+    parser.add_argument("--tailles", type=int, nargs="+", default=list(TAILLES), help="Nombres de lignes du journal")
+    parser.add_argument("--repetitions", type=int, default=3, help="Exécutions par taille (médiane)")
+    for service, latence in LATENCES.items():
+        parser.add_argument(f"--latence-{service}", type=float, default=latence,
+                            help=f"Latence injectée ({service}), en secondes")
+    parser.add_argument("--reference", default=FICHIER_REFERENCE, help="Fichier de référence JSON")
+    parser.add_argument("--enregistrer", action="store_true", help="Remplace la référence par ces mesures")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Ralentissement relatif toléré")
+    parser.add_argument("--budget-demarrage", type=int, default=BUDGET_DEMARRAGE_MS,
+                        help="Premier rendu maximal (ms)")
+    parser.add_argument("--scenario", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--latences", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        # Sous-processus : une session, résultat JSON sur la dernière ligne
+        sys.path.insert(0, DOSSIER_APP)
+        print(json.dumps(scenario(args.scenario, json.loads(args.latences))))
+        return 0
+
+    latences = {service: getattr(args, f"latence_{service}") for service in LATENCES}
+    print(f"⏱️  Latences injectées : {latences}")
+    resultats = {}
+    for taille in args.tailles:
+        print(f"▶️  {taille} lignes ({args.repetitions} exécutions)...")
+        resultats[str(taille)] = lancer(taille, latences, args.repetitions)
+
+    reference = {}
+    if os.path.exists(args.reference):
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference = json.load(f)
+    if reference.get("latences", latences) != latences:
+        print("⚠️  Latences différentes de celles de la référence : comparaison indicative")
+
+    lignes, regressions = comparer(resultats, reference.get("mesures", {}), tolerance=args.tolerance)
+    print("\n".join(lignes))
+    lignes, depassements = verifier_budget(resultats, args.budget_demarrage)
+    print("\n".join(lignes))
+
+    if args.enregistrer:
+        with open(args.reference, "w", encoding="utf-8") as f:
+            json.dump({"latences": latences, "mesures": resultats}, f, indent=2)
+        print(f"💾 Référence enregistrée : {args.reference}")
+        return 0
+    if depassements:
+        print(f"❌ Budget de démarrage dépassé ({len(depassements)} taille(s))")
+        return 1
+    if regressions:
+        print(f"❌ {len(regressions)} régression(s) par rapport à la référence")
+        return 1
+    print("✅ Aucune régression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import mesures
+
+# ==========================================
+# CACHE CLÉ -> VALEURS SUR DISQUE (SQLITE + TTL)
+# ==========================================
+
+
+class CacheDisque:
+    """Entrées {cle: valeurs JSON} en SQLite, avec un statut et une expiration par entrée.
+
+    `ttl` associe à chaque statut ("ok", "absent", "erreur"...) sa durée de vie en secondes :
+    les résultats négatifs peuvent ainsi vivre moins longtemps que les positifs.
+    Une copie mémoire évite de toucher SQLite pour les clés déjà vues dans le processus.
+    """
+
+    def __init__(self, chemin, ttl):
+        self.chemin = chemin
+        self.ttl = ttl
+        self._memoire = {}  # cle -> (valeurs, statut, expire)
+        self._verrou = threading.Lock()
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        with self._connexion() as cx:
+            cx.execute("PRAGMA journal_mode=WAL")
+            cx.execute(
+                "CREATE TABLE IF NOT EXISTS entrees ("
+                "cle TEXT PRIMARY KEY, valeurs TEXT, statut TEXT, expire REAL)"
+            )
+
+    def _connexion(self):
+        return sqlite3.connect(self.chemin, timeout=10, check_same_thread=False)
+
+    def lire(self, cle):
+        """Retourne (valeurs, statut) si une entrée non expirée existe, sinon None."""
+        maintenant = time.time()
+        trouve = self._memoire.get(cle)
+        if trouve is None or trouve[2] < maintenant:
+            with self._connexion() as cx:
+                ligne = cx.execute(
+                    "SELECT valeurs, statut, expire FROM entrees WHERE cle = ?", (cle,)
+                ).fetchone()
+            if ligne is None:
+                mesures.compter_cache(type(self).__name__, False)
+                return None
+            trouve = (json.loads(ligne[0]), ligne[1], ligne[2])
+            with self._verrou:
+                self._memoire[cle] = trouve
+        valeurs, statut, expire = trouve
+        if expire < maintenant:
+            mesures.compter_cache(type(self).__name__, False)
+            return None
+        mesures.compter_cache(type(self).__name__, True)
+        return dict(valeurs), statut
+
+    def ecrire(self, cle, valeurs, statut):
+        expire = time.time() + self.ttl[statut]
+        with self._connexion() as cx:
+            cx.execute(
+                "INSERT OR REPLACE INTO entrees VALUES (?, ?, ?, ?)",
+                (cle, json.dumps(valeurs, ensure_ascii=False), statut, expire)
+            )
+        with self._verrou:
+            self._memoire[cle] = (dict(valeurs), statut, expire)
+
+    def ecrire_lot(self, entrees, statut):
+        """Écrit {cle: valeurs} en une transaction, sans écraser les entrées encore valides."""
+        maintenant = time.time()
+        expire = maintenant + self.ttl[statut]
+        with self._connexion() as cx:
+            cx.executemany(
+                "INSERT INTO entrees VALUES (?, ?, ?, ?) ON CONFLICT(cle) DO UPDATE SET "
+                "valeurs = excluded.valeurs, statut = excluded.statut, expire = excluded.expire "
+                "WHERE entrees.expire < ?",
+                [(cle, json.dumps(valeurs, ensure_ascii=False), statut, expire, maintenant)
+                 for cle, valeurs in entrees.items()]
+            )
+
+    def vider_memoire(self):
+        with self._verrou:
+            self._memoire.clear()
@@ -0,0 +1,63 @@
+import functools
+
+import streamlit as st
+
+import mesures
+
+# ==========================================
+# RÉGIONS DE CACHE NOMMÉES
+# ==========================================
+# Chaque région regroupe des fonctions `st.cache_data` invalidées ensemble,
+# pour qu'une notation ne vide plus les pochettes ou les résumés Wikipédia.
+METADONNEES = "metadonnees"  # Pochettes et années (iTunes)
+WIKIPEDIA = "wikipedia"      # Résumés d'albums
+VUES = "vues"                # Vues dérivées (calendrier, galerie, stats...)
+
+# Régions qui dépendent des notes : invalidées à chaque écriture
+DEPENDENT_DES_NOTES = (VUES,)
+
+_REGIONS = {}  # nom -> fonctions de vidage
+
+
+def enregistrer(nom, vider):
+    """Rattache à la région `nom` un cache maison (fonction sans argument qui le vide)."""
+    if vider not in _REGIONS.setdefault(nom, []):
+        _REGIONS[nom].append(vider)
+
+
+def region(nom, **options):
+    """Décorateur : comme `st.cache_data(**options)`, rattaché à la région `nom`.
+
+    Chaque appel est compté comme succès ou échec du cache dans la trace du rerun (voir mesures.py).
+    """
+    def decorateur(func):
+        nom_cache = f"{nom}.{func.__name__}"
+
+        @functools.wraps(func)
+        def calcul(*args, **kwargs):
+            mesures.compter_cache(nom_cache, False)  # Exécuté seulement si la valeur n'est pas en cache
+            return func(*args, **kwargs)
+
+        cachee = st.cache_data(**options)(calcul)
+
+        @functools.wraps(func)
+        def appel(*args, **kwargs):
+            with mesures.suivre_cache(nom_cache):
+                return cachee(*args, **kwargs)
+
+        appel.clear = cachee.clear
+        enregistrer(nom, cachee.clear)
+        return appel
+    return decorateur
+
+
+def invalider(*noms):
+    """Vide uniquement les régions demandées."""
+    for nom in noms:
+        for vider in _REGIONS.get(nom, []):
+            vider()
+
+
+def invalider_notes():
+    """À appeler après une écriture de notes : les métadonnées d'albums sont conservées."""
+    invalider(*DEPENDENT_DES_NOTES)
@@ -0,0 +1,119 @@
+import csv
+import json
+import os
+import re
+
+from normalisation import cle_album, normaliser_texte
+
+# ==========================================
+# CATALOGUE D'ALBUMS (FICHIER DE DONNÉES)
+# ==========================================
+FICHIER_CATALOGUE = "catalogue.csv"
+TAG_PAR_DEFAUT = "Découverte"
+
+# Mentions de version retirées pour repérer les variantes d'un même album :
+# "Red (Taylor's Version)", "Thriller [Remastered]"...
+_MENTION_VERSION = re.compile(r"\s*[(\[][^)\]]*[)\]]\s*")
+
+
+def _lire_csv(chemin):
+    """Lignes CSV avec en-tête ; lignes vides et commentaires (#) ignorés."""
+    with open(chemin, "r", encoding="utf-8", newline="") as f:
+        lignes = [l for l in f if l.strip() and not l.lstrip().startswith("#")]
+    return list(csv.DictReader(lignes))
+
+
+def _lire_json(chemin):
+    """Liste d'objets, ou {"albums": [...]}."""
+    with open(chemin, "r", encoding="utf-8") as f:
+        donnees = json.load(f)
+    return donnees["albums"] if isinstance(donnees, dict) else donnees
+
+
+def _lire_toml(chemin):
+    """Tables [[albums]]."""
+    import tomllib  # Python 3.11+
+
+    with open(chemin, "rb") as f:
+        return tomllib.load(f)["albums"]
+
+
+LECTEURS = {".csv": _lire_csv, ".json": _lire_json, ".toml": _lire_toml}
+
+
+def charger_catalogue(chemin=FICHIER_CATALOGUE):
+    """Albums du fichier (CSV, JSON ou TOML selon l'extension), dans l'ordre du fichier."""
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension not in LECTEURS:
+        raise ValueError(f"Format de catalogue non supporté : {chemin} (attendu : {', '.join(LECTEURS)})")
+    albums = []
+    for entree in LECTEURS[extension](chemin):
+        artiste = str(entree.get("artiste") or "").strip()
+        album = str(entree.get("album") or "").strip()
+        if not artiste or not album:
+            continue
+        albums.append({
+            "artiste": artiste,
+            "album": album,
+            "genre": str(entree.get("genre") or "").strip(),
+            "tag": str(entree.get("tag") or "").strip() or TAG_PAR_DEFAUT,
+        })
+    return albums
+
+
+def cle_variante(artiste, album):
+    """Clé de l'album sans mention de version : les variantes d'un même album la partagent."""
+    return cle_album(artiste, _MENTION_VERSION.sub(" ", album))
+
+
+def dedoublonner(albums):
+    """Retire les doublons en une passe (ensemble de clés normalisées).
+
+    Retourne (uniques, doublons, variantes) :
+    - doublons : (retenu, retiré) de même clé normalisée ("D'angelo" / "D'Angelo") ;
+    - variantes : (premier, autre) qui ne diffèrent que par une mention de version
+      ("1989" / "1989 (Taylor's Version)"), conservés tous les deux et seulement signalés.
+    """
+    uniques, doublons, variantes = [], [], []
+    vus = {}          # cle_album -> album retenu
+    par_variante = {}  # cle_variante -> premier album retenu
+    for entree in albums:
+        cle = cle_album(entree["artiste"], entree["album"])
+        if cle in vus:
+            doublons.append((vus[cle], entree))
+            continue
+        vus[cle] = entree
+        uniques.append(entree)
+        variante = cle_variante(entree["artiste"], entree["album"])
+        if variante in par_variante:
+            variantes.append((par_variante[variante], entree))
+        else:
+            par_variante[variante] = entree
+    return uniques, doublons, variantes
+
+
+def _libelle(entree):
+    return f"{entree['artiste']} - {entree['album']}"
+
+
+def rapport(uniques, doublons, variantes):
+    """Lignes lisibles : doublons retirés, variantes et graphies d'artistes divergentes signalées."""
+    lignes = []
+    for retenu, retire in doublons:
+        if retenu["artiste"] == retire["artiste"] and retenu["album"] == retire["album"]:
+            lignes.append(f"🔁 Doublon retiré : {_libelle(retire)}")
+        else:
+            lignes.append(f"🔁 Quasi-doublon retiré : {_libelle(retire)} (déjà présent : {_libelle(retenu)})")
+    for premier, autre in variantes:
+        lignes.append(f"🔀 Variante conservée : {_libelle(autre)} (proche de : {_libelle(premier)})")
+    for noms in artistes_proches(uniques).values():
+        lignes.append(f"✏️  Artiste écrit de plusieurs façons : {' / '.join(noms)}")
+    return lignes
+
+
+def artistes_proches(albums):
+    """Noms d'artistes écrits de plusieurs façons (casse, accents, espaces) : {forme normalisée: graphies}."""
+    graphies = {}
+    for entree in albums:
+        graphies.setdefault(normaliser_texte(entree["artiste"]), set()).add(entree["artiste"])
+    return {cle: sorted(noms) for cle, noms in graphies.items() if len(noms) > 1}
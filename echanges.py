@@ -0,0 +1,171 @@
+import io
+import json
+import os
+
+import pandas as pd
+
+import caches
+from stockage import valeur_cellule
+
+# ==========================================
+# IMPORT / EXPORT DES NOTES (PAR LOT)
+# ==========================================
+# Un fichier CSV ou JSON de notes est fusionné avec le journal par date : seules les
+# colonnes présentes dans le fichier (et les cellules non vides) remplacent les valeurs.
+# Tout le lot part ensuite en une seule écriture (voir JournalLocal.modifier).
+COLONNES_IMPORT = ['ecoute', 'note', 'avis', 'deja_connu', 'pays']
+COLONNES_EXPORT = ['date', 'artiste', 'album', 'genre', 'tag', 'ecoute', 'note', 'avis', 'deja_connu', 'pays']
+FORMATS = ("csv", "json")
+
+VRAI = {"true", "vrai", "oui", "yes", "1", "x"}
+FAUX = {"false", "faux", "non", "no", "0"}
+
+
+class ErreurImport(Exception):
+    """Fichier illisible (format inconnu, JSON invalide, colonne `date` absente)."""
+
+
+def lire_fichier(nom, contenu):
+    """Octets d'un fichier .csv ou .json -> DataFrame de texte (une ligne par date).
+
+    Le JSON peut être une liste d'objets (avec `date`) ou, comme le journal généré,
+    un objet {date: {colonne: valeur}}.
+    """
+    extension = os.path.splitext(nom)[1].lower().lstrip(".")
+    if extension not in FORMATS:
+        raise ErreurImport(f"Format non pris en charge : .{extension} (attendu : {', '.join(FORMATS)})")
+    texte = _decoder(contenu)
+    try:
+        df = _lire_csv(texte) if extension == "csv" else _lire_json(texte)
+    except ErreurImport:
+        raise
+    except Exception as e:  # Fichier mal formé : message à l'utilisateur plutôt qu'une exception
+        raise ErreurImport(f"{extension.upper()} illisible : {e}") from e
+
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    if 'date' not in df.columns:
+        raise ErreurImport("Colonne `date` absente")
+    return df
+
+
+def _decoder(contenu):
+    """UTF-8 (avec ou sans BOM), sinon Windows-1252 / Latin-1 (CSV enregistré par Excel)."""
+    for encodage in ("utf-8-sig", "cp1252", "latin-1"):
+        try:
+            return contenu.decode(encodage)
+        except UnicodeDecodeError:
+            continue
+
+
+def _lire_csv(texte):
+    if not texte.strip():
+        raise ErreurImport("Fichier vide")
+    # Séparateur deviné sur la première ligne (, ; ou tabulation) ; une seule colonne sinon
+    entete = texte.splitlines()[0]
+    sep = max(",;\t", key=entete.count) if any(c in entete for c in ",;\t") else ","
+    return pd.read_csv(io.StringIO(texte), dtype=str, keep_default_na=False, sep=sep)
+
+
+def _lire_json(texte):
+    try:
+        donnees = json.loads(texte)
+    except json.JSONDecodeError as e:
+        raise ErreurImport(f"JSON invalide : {e}") from e
+    if isinstance(donnees, dict) and all(isinstance(ligne, dict) for ligne in donnees.values()):
+        df = pd.DataFrame.from_dict(donnees, orient='index').rename_axis('date').reset_index()
+    elif isinstance(donnees, list) and all(isinstance(ligne, dict) for ligne in donnees):
+        df = pd.DataFrame(donnees)
+    else:
+        raise ErreurImport("JSON attendu : liste d'objets ou objet {date: {...}}")
+    return df.astype(object).where(df.notna(), "").astype(str)
+
+
+def _booleen(texte):
+    texte = texte.strip().lower()
+    if texte in VRAI:
+        return True
+    if texte in FAUX:
+        return False
+    raise ValueError(f"booléen attendu, reçu « {texte} »")
+
+
+def _note(texte):
+    """Note entière de 0 à 5 ("4" ou "4.0" ; "3.7", "inf" ou "abc" sont refusés)."""
+    texte = texte.strip()
+    entier, _, decimales = texte.replace(",", ".").partition(".")
+    if not (entier.isascii() and entier.isdigit()) or decimales.strip("0"):
+        raise ValueError(f"note entière attendue, reçu « {texte} »")
+    note = int(entier)
+    if not 0 <= note <= 5:
+        raise ValueError(f"note entre 0 et 5 attendue, reçu {note}")
+    return note
+
+
+CONVERSIONS = {
+    'ecoute': _booleen,
+    'note': _note,
+    'avis': str,
+    'deja_connu': _booleen,
+    'pays': str.strip,
+}
+
+
+def fusionner(fichier, journal):
+    """Compare le fichier importé au journal.
+
+    Retourne (changements, erreurs, apercu) :
+    - changements : {date: {colonne: valeur}} pour les seules valeurs qui changent ;
+    - erreurs : messages (ligne du fichier + raison), les lignes en erreur sont ignorées ;
+    - apercu : DataFrame date / artiste / album / colonne / avant / après.
+    Une note sans colonne `ecoute` vaut écoute validée.
+    """
+    colonnes = [c for c in COLONNES_IMPORT if c in fichier.columns]
+    # Dates ISO (comme le journal), sinon format français (jj/mm/aaaa)
+    texte = fichier['date'].str.strip()
+    dates = pd.to_datetime(texte, errors='coerce', format='%Y-%m-%d')
+    dates = dates.fillna(pd.to_datetime(texte, errors='coerce', format='mixed', dayfirst=True))
+    fichier = fichier.assign(date=dates.dt.strftime('%Y-%m-%d'))
+
+    erreurs, changements = [], {}
+    doublons = fichier['date'].duplicated(keep=False) & fichier['date'].notna()
+    for num, ligne in zip(range(2, len(fichier) + 2), fichier.to_dict('records')):
+        date = ligne['date']
+        if not isinstance(date, str):
+            erreurs.append(f"Ligne {num} : date illisible")
+            continue
+        if date not in journal.index:
+            erreurs.append(f"Ligne {num} : {date} absente du journal")
+            continue
+        if doublons.iloc[num - 2]:
+            erreurs.append(f"Ligne {num} : {date} présente plusieurs fois dans le fichier")
+            continue
+        try:
+            valeurs = {c: CONVERSIONS[c](ligne[c]) for c in colonnes if str(ligne[c]).strip() != ""}
+        except ValueError as e:
+            erreurs.append(f"Ligne {num} ({date}) : {e}")
+            continue
+        if valeurs.get('note', 0) > 0 and 'ecoute' not in colonnes:
+            valeurs['ecoute'] = True
+        # Seules les valeurs qui changent (mêmes conversions que pour la feuille)
+        valeurs = {c: v for c, v in valeurs.items() if valeur_cellule(journal.at[date, c]) != valeur_cellule(v)}
+        if valeurs:
+            changements[date] = valeurs
+
+    apercu = pd.DataFrame(
+        [
+            (date, journal.at[date, 'artiste'], journal.at[date, 'album'], col, journal.at[date, col], valeur)
+            for date, valeurs in changements.items()
+            for col, valeur in valeurs.items()
+        ],
+        columns=['date', 'artiste', 'album', 'colonne', 'avant', 'apres']
+    ).astype({'avant': str, 'apres': str})
+    return changements, erreurs, apercu
+
+
+@caches.region(caches.VUES, max_entries=2, show_spinner=False)
+def exporter(_df, version, format):
+    """Journal complet en CSV ou JSON ({date: {colonne: valeur}}, comme le journal généré)."""
+    df = _df[[c for c in COLONNES_EXPORT if c in _df.columns]]
+    if format == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    return df.set_index('date').to_json(orient='index', force_ascii=False, indent=2).encode("utf-8")
@@ -0,0 +1,142 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ==========================================
+# MESURES DE PERFORMANCE PAR RERUN
+# ==========================================
+# Une trace par exécution du script (ou d'un fragment) : durée et nombre d'appels
+# de chaque étape instrumentée, succès / échecs des caches. Hors d'une exécution
+# Streamlit (threads de fond, scripts en ligne de commande), rien n'est enregistré.
+FICHIER_JSONL = "mesures.jsonl"  # Dans le dossier local (voir stockage_local)
+HISTORIQUE = 50  # Traces conservées en mémoire pour le panneau
+
+historique = deque(maxlen=HISTORIQUE)
+_local = threading.local()
+_verrou = threading.Lock()
+
+
+class Trace:
+    def __init__(self, nom):
+        self.nom = nom
+        self.debut = time.time()
+        self._t0 = time.perf_counter()
+        self.duree = None
+        self.etapes = {}  # nom -> [appels, secondes]
+        self.caches = {}  # nom -> [succes, echecs]
+
+    def ajouter(self, nom, secondes):
+        etape = self.etapes.setdefault(nom, [0, 0.0])
+        etape[0] += 1
+        etape[1] += secondes
+
+    def compter(self, nom, succes):
+        compteur = self.caches.setdefault(nom, [0, 0])
+        compteur[0 if succes else 1] += 1
+
+    def en_dict(self):
+        return {
+            "trace": self.nom,
+            "debut": round(self.debut, 3),
+            "duree_ms": round((self.duree or 0) * 1000, 2),
+            "etapes": {nom: {"appels": n, "ms": round(s * 1000, 2)} for nom, (n, s) in self.etapes.items()},
+            "caches": {nom: {"succes": s, "echecs": e} for nom, (s, e) in self.caches.items()},
+        }
+
+
+def courante():
+    return getattr(_local, "trace", None)
+
+
+def demarrer(nom="rerun"):
+    """Ouvre la trace du thread courant (une trace restée ouverte, rerun interrompu, est close)."""
+    terminer()
+    _local.trace = Trace(nom)
+    return _local.trace
+
+
+def terminer():
+    """Ferme la trace courante et l'ajoute à l'historique ; retourne son dict (ou None)."""
+    trace = courante()
+    if trace is None:
+        return None
+    _local.trace = None
+    trace.duree = time.perf_counter() - trace._t0
+    resultat = trace.en_dict()
+    with _verrou:
+        historique.append(resultat)
+    return resultat
+
+
+def _dans_un_rerun():
+    """Vrai dans le thread d'exécution d'un script Streamlit (pas dans les threads de fond)."""
+    # Import différé : les scripts en ligne de commande n'en ont pas besoin
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+@contextmanager
+def mesurer(nom):
+    """Chronomètre un bloc. Sans trace ouverte (rerun d'un fragment), le bloc devient la trace ;
+    hors d'une exécution Streamlit (thread de synchro, préchargement), il n'est pas mesuré."""
+    racine = courante() is None
+    if racine and not _dans_un_rerun():
+        yield
+        return
+    trace = demarrer(nom) if racine else courante()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.ajouter(nom, time.perf_counter() - t0)
+        if racine:
+            terminer()
+
+
+def mesure(nom):
+    """Décorateur : `mesurer(nom)` autour de chaque appel."""
+    def decorateur(func):
+        @functools.wraps(func)
+        def enveloppe(*args, **kwargs):
+            with mesurer(nom):
+                return func(*args, **kwargs)
+        return enveloppe
+    return decorateur
+
+
+def compter_cache(nom, succes):
+    """Enregistre un succès (valeur trouvée) ou un échec (valeur recalculée) du cache `nom`."""
+    trace = courante()
+    if trace is not None:
+        trace.compter(nom, succes)
+
+
+@contextmanager
+def suivre_cache(nom):
+    """Autour d'un appel à un cache qui signale lui-même ses échecs : sans échec, c'est un succès."""
+    trace = courante()
+    echecs_avant = trace.caches.get(nom, [0, 0])[1] if trace is not None else 0
+    yield
+    if trace is not None and trace.caches.get(nom, [0, 0])[1] == echecs_avant:
+        trace.compter(nom, True)
+
+
+def en_jsonl(traces):
+    return "".join(json.dumps(t, ensure_ascii=False) + "\n" for t in traces)
+
+
+def exporter(traces, chemin=None):
+    """Ajoute les traces au fichier JSON lines (une ligne par rerun)."""
+    if chemin is None:
+        # Import différé : stockage_local est lui-même instrumenté
+        from stockage_local import DOSSIER_LOCAL
+        chemin = os.path.join(DOSSIER_LOCAL, FICHIER_JSONL)
+    dossier = os.path.dirname(chemin)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    with _verrou, open(chemin, "a", encoding="utf-8") as f:
+        f.write(en_jsonl(traces))
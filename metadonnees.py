@@ -0,0 +1,341 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+import mesures
+from cache_disque import CacheDisque
+from normalisation import cle_album
+from stockage import FICHIER_JSON, charger_json
+from stockage_local import DOSSIER_LOCAL
+
+# ==========================================
+# MÉTADONNÉES D'ALBUMS (ITUNES) : CACHE PERSISTANT
+# ==========================================
+CHEMIN_DB = os.path.join(DOSSIER_LOCAL, "metadonnees.sqlite")
+CHEMIN_CHECKPOINT = os.path.join(DOSSIER_LOCAL, "enrichissement.json")
+
+# Image par défaut (Vinyle propre)
+DEFAULT_COVER = "https://upload.wikimedia.org/wikipedia/commons/thumb/b/b6/12in-Vinyl-LP-Record-Angle.jpg/640px-12in-Vinyl-LP-Record-Angle.jpg"
+
+# Durée de vie des entrées selon le résultat de la recherche (secondes)
+TTL = {
+    "ok": 90 * 24 * 3600,     # Pochette trouvée
+    "absent": 7 * 24 * 3600,  # Aucun résultat iTunes
+    "erreur": 15 * 60,        # Timeout / réseau : on réessaie vite
+}
+
+
+# Requêtes iTunes simultanées et débit maximal (l'API bride les clients trop bavards)
+NB_CONNEXIONS = 8
+REQUETES_PAR_SECONDE = 4
+
+
+def infos_par_defaut():
+    return {"cover": DEFAULT_COVER, "year": ""}
+
+
+def rechercher_itunes(artiste, album, session=None, timeout=3):
+    """Interroge l'API iTunes. Retourne les infos, ou None si aucun résultat.
+
+    Les erreurs réseau sont levées telles quelles.
+    """
+    client = session
+    if client is None:
+        import requests
+        client = requests
+    res = client.get(
+        "https://itunes.apple.com/search",
+        params={"term": f"{artiste} {album}", "entity": "album", "limit": 1},
+        timeout=timeout
+    ).json()
+    if res['resultCount'] == 0:
+        return None
+    data = res['results'][0]
+    return {
+        # On prend la grande image (600x600)
+        "cover": data.get('artworkUrl100', DEFAULT_COVER).replace("100x100", "600x600"),
+        "year": data.get('releaseDate', "")[:4],
+        "itunes_id": data.get('collectionId'),
+    }
+
+
+class LimiteurDebit:
+    """Espacement minimal entre deux requêtes, partagé entre threads."""
+
+    def __init__(self, par_seconde=REQUETES_PAR_SECONDE):
+        self.intervalle = 1 / par_seconde
+        self._prochain = 0.0
+        self._verrou = threading.Lock()
+
+    def attendre(self):
+        with self._verrou:
+            maintenant = time.monotonic()
+            attente = self._prochain - maintenant
+            self._prochain = max(maintenant, self._prochain) + self.intervalle
+        if attente > 0:
+            time.sleep(attente)
+
+
+def session_http(connexions=NB_CONNEXIONS):
+    """Session requests avec un pool de connexions HTTPS réutilisées (keep-alive)."""
+    # Import différé : requests n'est chargé qu'à la première requête réseau
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=connexions))
+    return session
+
+
+class CacheMetadonnees(CacheDisque):
+    """Pochettes et années par album (clé normalisée), en SQLite avec un TTL par entrée.
+
+    Les échecs sont enregistrés comme entrées négatives (`absent`, `erreur`) avec un TTL
+    plus court : un album introuvable n'est plus redemandé à chaque affichage.
+    Les appels iTunes passent par une session poolée et un limiteur de débit communs.
+    """
+
+    def __init__(self, chemin=CHEMIN_DB, nb_connexions=NB_CONNEXIONS, par_seconde=REQUETES_PAR_SECONDE):
+        super().__init__(chemin, TTL)
+        self.nb_connexions = nb_connexions
+        self.limiteur = LimiteurDebit(par_seconde)
+        self._session = None
+        self._file_fond = queue.Queue()  # Paires à résoudre en arrière-plan
+        self._thread_fond = None         # Créé à la première demande
+        self._en_fond = set()            # Paires en file ou en cours de résolution
+        self._verrou_fond = threading.Lock()
+
+    @property
+    def session(self):
+        """Session HTTP créée à la première requête (rien n'est ouvert tant que tout est en cache)."""
+        if self._session is None:
+            self._session = session_http(self.nb_connexions)
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def entree(self, artiste, album):
+        """Retourne (infos, statut) si une entrée valide existe, sinon None."""
+        return self.lire(cle_album(artiste, album))
+
+    def enregistrer(self, artiste, album, infos, statut):
+        self.ecrire(cle_album(artiste, album), {"cover": infos["cover"], "year": infos["year"]}, statut)
+
+    def importer_enrichissement(self, df):
+        """Pochettes / années calculées à la génération du journal -> entrées "ok" du cache.
+
+        La feuille Google ne garde pas les colonnes `cover` / `annee` : sans cet import, chaque
+        album du journal chargé depuis la feuille repartirait vers iTunes. Les entrées encore
+        valides sont conservées. Retourne le nombre d'albums enrichis proposés.
+        """
+        if 'cover' not in df.columns:
+            return 0
+        enrichi = df[df['cover'].fillna("").astype(str) != ""]
+        annees = enrichi['annee'] if 'annee' in enrichi.columns else pd.Series("", index=enrichi.index)
+        entrees = {
+            cle_album(artiste, album): {"cover": cover, "year": _annee(annee)}
+            for artiste, album, cover, annee in zip(enrichi['artiste'], enrichi['album'], enrichi['cover'], annees)
+        }
+        self.ecrire_lot(entrees, "ok")
+        return len(entrees)
+
+    # --- RÉSOLUTION ---
+    def rafraichir(self, artiste, album):
+        """Interroge iTunes et enregistre le résultat, même négatif. Retourne (infos, statut)."""
+        self.limiteur.attendre()
+        try:
+            infos = rechercher_itunes(artiste, album, session=self.session)
+            statut = "ok" if infos else "absent"
+        except Exception:
+            infos, statut = None, "erreur"
+        infos = infos or infos_par_defaut()
+        self.enregistrer(artiste, album, infos, statut)
+        return infos, statut
+
+    def resoudre_lot(self, paires, forcer=False, attendre=True):
+        """Résout toutes les paires (artiste, album) d'une vue en une fois.
+
+        Les entrées en cache sont lues directement ; les manquantes sont demandées à iTunes
+        en parallèle (pool de threads borné). Retourne {(artiste, album): infos}.
+        Avec `attendre=False`, les manquantes reçoivent l'image par défaut et sont demandées
+        en arrière-plan : elles seront servies depuis le cache au prochain affichage.
+        """
+        resultats, manquants = {}, {}
+        for artiste, album in paires:
+            if (artiste, album) in resultats or (artiste, album) in manquants:
+                continue
+            trouve = None if forcer else self.entree(artiste, album)
+            if trouve is None:
+                manquants[(artiste, album)] = None
+            else:
+                resultats[(artiste, album)] = trouve[0]
+
+        if manquants and not attendre:
+            self._resoudre_en_fond(list(manquants))
+            resultats.update((paire, infos_par_defaut()) for paire in manquants)
+        elif manquants:
+            with ThreadPoolExecutor(max_workers=min(self.nb_connexions, len(manquants))) as pool:
+                for paire, trouve in zip(manquants, pool.map(lambda p: self.rafraichir(*p), manquants)):
+                    resultats[paire] = trouve[0]
+        return resultats
+
+    def _resoudre_en_fond(self, paires):
+        with self._verrou_fond:
+            if self._thread_fond is None:
+                # Un seul thread : il ne réserve jamais plus d'un créneau du limiteur d'avance,
+                # les vues qui attendent leurs pochettes passent presque aussitôt.
+                # Thread démon : la file restante est abandonnée à l'arrêt du processus.
+                self._thread_fond = threading.Thread(target=self._boucle_fond, name="itunes-fond", daemon=True)
+                self._thread_fond.start()
+            for paire in paires:
+                if paire not in self._en_fond:
+                    self._en_fond.add(paire)
+                    self._file_fond.put(paire)
+
+    def _boucle_fond(self):
+        while True:
+            paire = self._file_fond.get()
+            try:
+                self.rafraichir(*paire)
+            finally:
+                with self._verrou_fond:
+                    self._en_fond.discard(paire)
+
+
+_cache = None
+
+
+def cache():
+    """Instance partagée par le processus."""
+    global _cache
+    if _cache is None:
+        _cache = CacheMetadonnees()
+    return _cache
+
+
+def _annee(valeur):
+    """Année enrichie telle que relue (2017, 2017.0, "2017" ou vide) -> "2017"."""
+    try:
+        return str(int(float(valeur)))
+    except (TypeError, ValueError):
+        return ""
+
+
+@mesures.mesure("itunes.get_albums_infos")
+def get_albums_infos(df, attendre=True):
+    """Version par lot pour une vue : {(artiste, album): infos} pour toutes les lignes de `df`.
+
+    Les lignes déjà enrichies à la génération du journal (colonne `cover`) sont servies
+    telles quelles, sans cache ni appel iTunes. `attendre=False` : voir `resoudre_lot`.
+    """
+    resultats = {}
+    if 'cover' in df.columns:
+        enrichi = df['cover'].fillna("").astype(str) != ""
+        annees = df['annee'] if 'annee' in df.columns else pd.Series("", index=df.index)
+        for artiste, album, cover, annee in zip(df['artiste'][enrichi], df['album'][enrichi],
+                                                df['cover'][enrichi], annees[enrichi]):
+            resultats[(artiste, album)] = {"cover": cover, "year": _annee(annee)}
+        df = df[~enrichi]
+    resultats.update(cache().resoudre_lot(df[['artiste', 'album']].itertuples(index=False, name=None), attendre=attendre))
+    return resultats
+
+
+# ==========================================
+# ENRICHISSEMENT DU JOURNAL À LA GÉNÉRATION
+# ==========================================
+def _ecrire_json(chemin, donnees, indent=None):
+    """Écriture atomique (fichier temporaire puis remplacement)."""
+    dossier = os.path.dirname(chemin)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    with open(chemin + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(donnees, f, indent=indent, ensure_ascii=False)
+    os.replace(chemin + ".tmp", chemin)
+
+
+def enrichir_planning(planning, checkpoint=CHEMIN_CHECKPOINT, nb_connexions=NB_CONNEXIONS,
+                      par_seconde=REQUETES_PAR_SECONDE, frequence_sauvegarde=20):
+    """Ajoute `cover`, `annee` et `itunes_id` à chaque entrée du planning {date: album}.
+
+    Les recherches partent en parallèle (pool borné + limiteur de débit). Chaque résultat
+    est noté dans un fichier checkpoint : une exécution interrompue reprend là où elle
+    s'était arrêtée. Les erreurs réseau ne sont pas notées et seront retentées.
+    Retourne le nombre d'entrées sans résultat définitif (erreurs).
+    """
+    faits = {}
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint, 'r', encoding='utf-8') as f:
+            faits = json.load(f)
+
+    a_faire = {}
+    for item in planning.values():
+        cle = cle_album(item['artiste'], item['album'])
+        if cle not in faits:
+            a_faire[cle] = (item['artiste'], item['album'])
+
+    if a_faire:
+        session = session_http(nb_connexions)
+        limiteur = LimiteurDebit(par_seconde)
+
+        def chercher(paire):
+            limiteur.attendre()
+            try:
+                return rechercher_itunes(*paire, session=session) or {"cover": DEFAULT_COVER, "year": "", "itunes_id": None}
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=nb_connexions) as pool:
+            for i, (cle, infos) in enumerate(zip(a_faire, pool.map(chercher, a_faire.values())), 1):
+                if infos is not None:
+                    faits[cle] = infos
+                if checkpoint and i % frequence_sauvegarde == 0:
+                    _ecrire_json(checkpoint, faits)
+        if checkpoint:
+            _ecrire_json(checkpoint, faits)
+
+    erreurs = 0
+    for item in planning.values():
+        infos = faits.get(cle_album(item['artiste'], item['album']))
+        if infos is None:
+            erreurs += 1
+            continue
+        item['cover'] = infos['cover']
+        item['annee'] = infos['year']
+        item['itunes_id'] = infos['itunes_id']
+    return erreurs
+
+
+# ==========================================
+# CLI : PRÉCHAUFFAGE DU CACHE
+# ==========================================
+def prechauffer(chemin_journal, forcer=False):
+    """Résout tous les albums du journal pour qu'un démarrage à froid n'appelle pas iTunes."""
+    df = charger_json(chemin_journal)
+    store = cache()
+    paires = list(dict.fromkeys(df[['artiste', 'album']].itertuples(index=False, name=None)))
+    a_resoudre = paires if forcer else [p for p in paires if store.entree(*p) is None]
+    store.resoudre_lot(a_resoudre, forcer=True)
+
+    compteurs = {"cache": len(paires) - len(a_resoudre), "ok": 0, "absent": 0, "erreur": 0}
+    for paire in a_resoudre:
+        compteurs[store.entree(*paire)[1]] += 1
+    return compteurs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Préchauffe le cache des pochettes/années (iTunes).")
+    parser.add_argument("--journal", default=FICHIER_JSON, help="Journal JSON à parcourir")
+    parser.add_argument("--forcer", action="store_true", help="Ignore les entrées encore valides")
+    args = parser.parse_args()
+
+    print("🔥 Préchauffage du cache des métadonnées...")
+    resultat = prechauffer(args.journal, forcer=args.forcer)
+    print(f"✅ Déjà en cache : {resultat['cache']} | Trouvés : {resultat['ok']} | "
+          f"Introuvables : {resultat['absent']} | Erreurs : {resultat['erreur']}")
@@ -0,0 +1,18 @@
+import re
+import unicodedata
+
+# ==========================================
+# NORMALISATION DES NOMS (ARTISTES / ALBUMS)
+# ==========================================
+
+
+def normaliser_texte(texte):
+    """Minuscules, sans accents ni espaces superflus : "Cesária  Évora" -> "cesaria evora"."""
+    texte = unicodedata.normalize("NFKD", str(texte))
+    texte = "".join(c for c in texte if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", texte.casefold()).strip()
+
+
+def cle_album(artiste, album):
+    """Clé stable d'un album, insensible à la casse, aux accents et aux espaces."""
+    return f"{normaliser_texte(artiste)}|{normaliser_texte(album)}"
@@ -0,0 +1,116 @@
+import heapq
+import random
+from collections import defaultdict, deque
+from datetime import timedelta
+
+from normalisation import normaliser_texte
+
+# ==========================================
+# PLANIFICATION DU JOURNAL (GRAINE + CONTRAINTES)
+# ==========================================
+TAG_INTEGRALE = "INTEGRALE"
+
+ECART_ARTISTE = 7  # Jours minimum entre deux albums du même artiste
+ECART_GENRE = 1    # Nombre de jours précédents dont le genre ne doit pas se répéter
+
+# Candidats examinés au plus par jour pour respecter la rotation des genres
+ESSAIS_GENRE = 8
+
+
+def _files_par_artiste(albums, rng):
+    """File d'albums par artiste : ordre du catalogue (chronologique) pour une INTEGRALE, mélangé sinon."""
+    files = defaultdict(list)
+    for album in albums:
+        files[normaliser_texte(album["artiste"])].append(album)
+    for file in files.values():
+        # Seuls les albums hors INTEGRALE échangent leurs places entre eux
+        places = [i for i, album in enumerate(file) if album.get("tag") != TAG_INTEGRALE]
+        libres = [file[i] for i in places]
+        rng.shuffle(libres)
+        for i, album in zip(places, libres):
+            file[i] = album
+    return {artiste: deque(file) for artiste, file in files.items()}
+
+
+def ordonner(albums, graine, ecart_artiste=ECART_ARTISTE, ecart_genre=ECART_GENRE):
+    """Ordre d'écoute des albums, reproductible pour une même graine.
+
+    Glouton à base de tas, en O(n log a) pour n albums et a artistes :
+    - chaque jour, l'artiste disponible ayant le plus d'albums restants passe en premier
+      (les grosses discographies sont étalées sur toute la période) ;
+    - un artiste joué attend `ecart_artiste` jours avant de redevenir disponible ;
+    - le genre ne doit pas apparaître dans les `ecart_genre` jours précédents ;
+    - une INTEGRALE est écoutée dans l'ordre du catalogue.
+    Quand aucune option ne respecte une contrainte, elle est relâchée pour ce jour-là.
+
+    Retourne (ordre, relachements) où relachements compte {"genre": n, "artiste": n}.
+    """
+    rng = random.Random(graine)
+    files = _files_par_artiste(albums, rng)
+    # Tas (-albums restants, tirage aléatoire, artiste) et attente (jour de disponibilité, tirage, artiste)
+    disponibles = [(-len(file), rng.random(), artiste) for artiste, file in files.items()]
+    heapq.heapify(disponibles)
+    en_attente = []
+    derniers_genres = deque(maxlen=max(ecart_genre, 0))
+    relachements = {"genre": 0, "artiste": 0}
+    ordre = []
+
+    for jour in range(len(albums)):
+        while en_attente and en_attente[0][0] <= jour:
+            _, alea, artiste = heapq.heappop(en_attente)
+            heapq.heappush(disponibles, (-len(files[artiste]), alea, artiste))
+
+        if not disponibles:
+            # Tous les artistes restants sont en attente : on prend celui qui se libère le plus tôt
+            _, alea, artiste = heapq.heappop(en_attente)
+            heapq.heappush(disponibles, (-len(files[artiste]), alea, artiste))
+            relachements["artiste"] += 1
+
+        # Premier candidat dont le genre n'est pas dans les derniers jours ; à défaut, le meilleur
+        ecartes = []
+        choisi = None
+        while disponibles and len(ecartes) < ESSAIS_GENRE:
+            entree = heapq.heappop(disponibles)
+            if files[entree[2]][0].get("genre") not in derniers_genres:
+                choisi = entree
+                break
+            ecartes.append(entree)
+        if choisi is None:
+            choisi = ecartes.pop(0)
+            relachements["genre"] += 1
+        for entree in ecartes:
+            heapq.heappush(disponibles, entree)
+
+        _, alea, artiste = choisi
+        album = files[artiste].popleft()
+        ordre.append(album)
+        derniers_genres.append(album.get("genre"))
+        if files[artiste]:
+            heapq.heappush(en_attente, (jour + ecart_artiste, rng.random(), artiste))
+
+    return ordre, relachements
+
+
+def selectionner(albums, nb, graine):
+    """`nb` albums tirés au hasard (reproductible), dans l'ordre du catalogue."""
+    if len(albums) <= nb:
+        return list(albums)
+    indices = sorted(random.Random(graine).sample(range(len(albums)), nb))
+    return [albums[i] for i in indices]
+
+
+def planifier(albums, debut, nb_jours, graine, ecart_artiste=ECART_ARTISTE, ecart_genre=ECART_GENRE):
+    """Planning {"AAAA-MM-JJ": album} de `nb_jours` jours à partir de `debut`.
+
+    Retourne (planning, nb_jokers, relachements) ; les jours sans album reçoivent un joker.
+    """
+    choix = selectionner(albums, nb_jours, graine)
+    ordre, relachements = ordonner(choix, graine, ecart_artiste, ecart_genre)
+    nb_jokers = nb_jours - len(ordre)
+    for compteur in range(1, nb_jokers + 1):
+        ordre.append({
+            "artiste": f"Journée Libre {compteur}", "album": "Choisis un album !", "genre": "Joker", "tag": "Libre",
+            "ecoute": False, "note": None, "avis": ""
+        })
+    planning = {str(debut + timedelta(days=i)): album for i, album in enumerate(ordre)}
+    return planning, nb_jokers, relachements
@@ -0,0 +1,154 @@
+import argparse
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mesures
+from metadonnees import NB_CONNEXIONS, session_http
+from stockage_local import DOSSIER_LOCAL
+
+# ==========================================
+# POCHETTES : COPIE LOCALE + MINIATURES
+# ==========================================
+DOSSIER = os.path.join(DOSSIER_LOCAL, "pochettes")
+
+# Variantes produites à partir d'une seule image téléchargée (côté le plus long, en px)
+TAILLES = {"mini": 100, "moyenne": 320}
+QUALITE_JPEG = 85
+
+# Après un échec de téléchargement, l'URL distante est servie telle quelle pendant ce délai
+DELAI_ECHEC = 15 * 60
+
+
+class CachePochettes:
+    """Chaque pochette est téléchargée une fois, réduite en `TAILLES` et gardée sur disque.
+
+    `servir_lot()` retourne, pour chaque URL, le chemin du fichier local (Streamlit en sert
+    les octets lui-même, le navigateur ne contacte plus le CDN d'Apple) ou, à défaut, l'URL d'origine.
+    """
+
+    def __init__(self, dossier=DOSSIER, nb_connexions=NB_CONNEXIONS):
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+        self.nb_connexions = nb_connexions
+        self._session = None
+        self._pool = ThreadPoolExecutor(max_workers=nb_connexions, thread_name_prefix="pochettes")
+        self._en_cours = {}  # url -> Future
+        self._echecs = {}    # url -> instant de l'échec
+        self._verrou = threading.Lock()
+
+    @property
+    def session(self):
+        """Session HTTP créée au premier téléchargement (rien n'est ouvert tant que tout est sur disque)."""
+        if self._session is None:
+            self._session = session_http(self.nb_connexions)
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def chemin(self, url, taille):
+        nom = hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.dossier, f"{nom}_{taille}.jpg")
+
+    def _disponible(self, url, taille):
+        return os.path.exists(self.chemin(url, taille))
+
+    def _telecharger(self, url):
+        """Télécharge l'image et écrit toutes ses variantes (écritures atomiques)."""
+        # Import différé : Pillow n'est chargé qu'à la première pochette à réduire
+        from PIL import Image
+
+        reponse = self.session.get(url, timeout=5)
+        reponse.raise_for_status()
+        with Image.open(io.BytesIO(reponse.content)) as image:
+            image = image.convert("RGB")
+            for taille, cote in TAILLES.items():
+                variante = image.copy()
+                variante.thumbnail((cote, cote))
+                chemin = self.chemin(url, taille)
+                variante.save(chemin + ".tmp", "JPEG", quality=QUALITE_JPEG, optimize=True)
+                os.replace(chemin + ".tmp", chemin)
+
+    def _lancer(self, url):
+        """Future du téléchargement de `url` (un seul à la fois par URL)."""
+        with self._verrou:
+            future = self._en_cours.get(url)
+            if future is None:
+                future = self._pool.submit(self._telecharger, url)
+                self._en_cours[url] = future
+                future.add_done_callback(lambda f: self._terminer(url, f))
+            return future
+
+    def _terminer(self, url, future):
+        with self._verrou:
+            self._en_cours.pop(url, None)
+            if future.exception() is not None:
+                self._echecs[url] = time.time()
+
+    def _a_tenter(self, url):
+        if not url.startswith(("http://", "https://")):
+            return False
+        echec = self._echecs.get(url)
+        return echec is None or time.time() - echec > DELAI_ECHEC
+
+    @mesures.mesure("pochettes.servir_lot")
+    def servir_lot(self, urls, taille, attendre=True):
+        """{url: chemin local ou url} ; les pochettes manquantes sont téléchargées en parallèle.
+
+        Avec `attendre=False`, les téléchargements continuent en arrière-plan et l'URL
+        d'origine est servie en attendant.
+        """
+        urls = list(dict.fromkeys(u for u in urls if u))
+        manquantes = [u for u in urls if not self._disponible(u, taille) and self._a_tenter(u)]
+        futures = {u: self._lancer(u) for u in manquantes}
+        if not attendre:
+            futures = {}
+        for url, future in futures.items():
+            try:
+                future.result()
+            except Exception:
+                self._echecs[url] = time.time()
+        return {u: self.chemin(u, taille) if self._disponible(u, taille) else u for u in urls}
+
+
+def en_data_uri(image):
+    """Chemin local -> data URI (pour une balise <img> en HTML) ; une URL est renvoyée telle quelle."""
+    if not os.path.exists(image):
+        return image
+    with open(image, "rb") as f:
+        return "data:image/jpeg;base64," + base64.b64encode(f.read()).decode("ascii")
+
+
+_cache = None
+
+
+def cache():
+    """Instance partagée par le processus."""
+    global _cache
+    if _cache is None:
+        _cache = CachePochettes()
+    return _cache
+
+
+# ==========================================
+# PRÉCHAUFFAGE (EN LIGNE DE COMMANDE)
+# ==========================================
+if __name__ == "__main__":
+    from metadonnees import get_albums_infos
+    from stockage import FICHIER_JSON, charger_journal
+
+    parser = argparse.ArgumentParser(description="Télécharge et réduit les pochettes du journal.")
+    parser.add_argument("--journal", default=FICHIER_JSON, help="Journal JSON à parcourir")
+    args = parser.parse_args()
+
+    print("🖼️  Préchauffage des pochettes...")
+    urls = {infos["cover"] for infos in get_albums_infos(charger_journal(args.journal)).values()}
+    servies = cache().servir_lot(urls, "mini")
+    nb_locales = sum(1 for url, image in servies.items() if image != url)
+    print(f"✅ Pochettes locales : {nb_locales} / {len(servies)}")
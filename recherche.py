@@ -0,0 +1,133 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from normalisation import normaliser_texte
+
+# ==========================================
+# INDEX DE RECHERCHE (ALBUMS DU JOURNAL)
+# ==========================================
+# Champs indexés et leur poids : un mot trouvé dans l'artiste ou l'album
+# compte plus qu'un mot trouvé dans le genre ou le tag.
+CHAMPS = {"artiste": 2, "album": 2, "genre": 1, "tag": 1, "pays": 1}
+
+# Score d'un mot de la requête selon la façon dont il correspond :
+# un mot exact dans le genre l'emporte sur un simple préfixe dans l'artiste
+EXACT, PREFIXE, APPROCHE = 5, 2, 1
+
+NB_RESULTATS = 20
+
+
+def mots(texte):
+    """Mots normalisés d'un texte (sans accents ni casse, ponctuation ignorée)."""
+    texte = normaliser_texte(texte)
+    return re.findall(r"\w+", texte) or ([texte] if texte else [])
+
+
+def trigrammes(mot):
+    mot = f"  {mot} "
+    return {mot[i:i + 3] for i in range(len(mot) - 2)}
+
+
+def distance_max(mot):
+    """Fautes tolérées : aucune pour les mots courts, une puis deux au-delà."""
+    return 0 if len(mot) <= 3 else 1 if len(mot) <= 6 else 2
+
+
+def distance(a, b, limite):
+    """Distance de Levenshtein bornée : renvoie `limite + 1` dès qu'elle est dépassée."""
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    precedente = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        courante = [i]
+        for j, cb in enumerate(b, 1):
+            courante.append(min(precedente[j] + 1, courante[j - 1] + 1, precedente[j - 1] + (ca != cb)))
+        if min(courante) > limite:
+            return limite + 1
+        precedente = courante
+    return precedente[-1]
+
+
+class IndexRecherche:
+    """Index inversé mot -> lignes, construit une fois par version des données.
+
+    - exact et préfixe : dichotomie dans le vocabulaire trié ;
+    - fautes de frappe : candidats par trigrammes communs, puis distance d'édition bornée.
+    Les lignes sont identifiées par leur date (index du DataFrame).
+    """
+
+    def __init__(self, df, version):
+        self.version = version
+        self.dates = list(df.index)
+        self._postings = defaultdict(dict)  # mot -> {ligne: poids}
+        for champ, poids in CHAMPS.items():
+            if champ not in df.columns:
+                continue
+            for ligne, valeur in enumerate(df[champ].astype(str)):
+                for mot in mots(valeur):
+                    postings = self._postings[mot]
+                    postings[ligne] = max(postings.get(ligne, 0), poids)
+        self._vocabulaire = sorted(self._postings)
+        self._trigrammes = defaultdict(set)
+        for mot in self._vocabulaire:
+            for tri in trigrammes(mot):
+                self._trigrammes[tri].add(mot)
+
+    def _correspondances(self, mot):
+        """{mot du vocabulaire: score} pour un mot de la requête."""
+        trouves = {}
+        i = bisect_left(self._vocabulaire, mot)
+        while i < len(self._vocabulaire) and self._vocabulaire[i].startswith(mot):
+            candidat = self._vocabulaire[i]
+            trouves[candidat] = EXACT if candidat == mot else PREFIXE
+            i += 1
+        limite = distance_max(mot)
+        if limite:
+            tris = trigrammes(mot)
+            communs = defaultdict(int)
+            for tri in tris:
+                for candidat in self._trigrammes.get(tri, ()):
+                    communs[candidat] += 1
+            seuil = len(tris) - 3 * limite  # Une faute détruit au plus 3 trigrammes
+            for candidat, nb in communs.items():
+                if candidat not in trouves and nb >= seuil and distance(mot, candidat, limite) <= limite:
+                    trouves[candidat] = APPROCHE
+        return trouves
+
+    def chercher(self, requete, n=NB_RESULTATS):
+        """Dates des `n` meilleures lignes : chaque mot de la requête doit correspondre."""
+        scores = None
+        for mot in mots(requete):
+            scores_mot = {}
+            for candidat, score in self._correspondances(mot).items():
+                for ligne, poids in self._postings[candidat].items():
+                    valeur = score * poids
+                    if valeur > scores_mot.get(ligne, 0):
+                        scores_mot[ligne] = valeur
+            if scores is None:
+                scores = scores_mot
+            else:
+                scores = {ligne: s + scores_mot[ligne] for ligne, s in scores.items() if ligne in scores_mot}
+            if not scores:
+                return []
+        if not scores:
+            return []
+        # Meilleur score d'abord, puis ordre chronologique
+        meilleures = heapq.nsmallest(n, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self.dates[ligne] for ligne, _ in meilleures]
+
+
+_verrou = threading.Lock()
+_courant = None
+
+
+def pour_version(df, version):
+    """Index de la version demandée : réutilise celui du processus, sinon le reconstruit."""
+    global _courant
+    with _verrou:
+        if _courant is None or _courant.version != version:
+            _courant = IndexRecherche(df, version)
+        return _courant
@@ -0,0 +1,100 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import mesures
+from cache_disque import CacheDisque
+from normalisation import cle_album
+from stockage_local import DOSSIER_LOCAL
+
+# ==========================================
+# RÉSUMÉS WIKIPÉDIA : CACHE PERSISTANT + PRÉCHARGEMENT
+# ==========================================
+CHEMIN_DB = os.path.join(DOSSIER_LOCAL, "resumes.sqlite")
+LANGUE = "fr"
+
+TTL = {
+    "ok": 30 * 24 * 3600,     # Article trouvé
+    "absent": 7 * 24 * 3600,  # Aucun article
+    "erreur": 15 * 60,        # Wikipédia injoignable : on réessaie vite
+}
+
+# Nombre de jours à venir (après l'album du jour) préchargés en arrière-plan
+JOURS_PRECHARGES = 3
+
+
+def rechercher_wikipedia(artiste, album):
+    """Résumé et lien de l'article, ou None si aucun article. Les erreurs réseau sont levées."""
+    # Import différé : la bibliothèque n'est chargée qu'au premier résumé demandé
+    import wikipedia
+
+    wikipedia.set_lang(LANGUE)
+    res_wiki = wikipedia.search(f"{album} {artiste}")
+    if not res_wiki:
+        return None
+    page = wikipedia.page(res_wiki[0])
+    return {"summary": page.summary, "url": page.url}
+
+
+class CacheResumes(CacheDisque):
+    """Résumés Wikipédia par album (clé normalisée), avec TTL et entrées négatives.
+
+    Rien n'est téléchargé au rendu : l'interface lit `entree()` et ne déclenche `resoudre()`
+    qu'à la demande. `precharger()` remplit le cache en fond pour les prochains albums.
+    """
+
+    def __init__(self, chemin=CHEMIN_DB, nb_threads=2):
+        super().__init__(chemin, TTL)
+        self._pool = ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix="wiki")
+        self._en_cours = set()
+        self._verrou_en_cours = threading.Lock()
+
+    def entree(self, artiste, album):
+        """Retourne (resume, statut) si une entrée valide existe, sinon None (lecture locale)."""
+        return self.lire(cle_album(artiste, album))
+
+    @mesures.mesure("wikipedia.resoudre")
+    def resoudre(self, artiste, album):
+        """Résumé depuis le cache, ou via Wikipédia (résultat mis en cache, même négatif).
+
+        Retourne (resume, statut) avec statut "ok", "absent" ou "erreur".
+        """
+        trouve = self.entree(artiste, album)
+        if trouve is not None:
+            return trouve
+        try:
+            resume = rechercher_wikipedia(artiste, album)
+            statut = "ok" if resume else "absent"
+        except Exception:
+            resume, statut = None, "erreur"
+        resume = resume or {}
+        self.ecrire(cle_album(artiste, album), resume, statut)
+        return resume, statut
+
+    def precharger(self, paires):
+        """Lance en arrière-plan la résolution des albums absents du cache."""
+        for artiste, album in paires:
+            cle = cle_album(artiste, album)
+            with self._verrou_en_cours:
+                if cle in self._en_cours or self.entree(artiste, album) is not None:
+                    continue
+                self._en_cours.add(cle)
+            self._pool.submit(self._precharger_un, cle, artiste, album)
+
+    def _precharger_un(self, cle, artiste, album):
+        try:
+            self.resoudre(artiste, album)
+        finally:
+            with self._verrou_en_cours:
+                self._en_cours.discard(cle)
+
+
+_cache = None
+
+
+def cache():
+    """Instance partagée par le processus."""
+    global _cache
+    if _cache is None:
+        _cache = CacheResumes()
+    return _cache
@@ -0,0 +1,100 @@
+import hashlib
+import os
+
+import pandas as pd
+
+# ==========================================
+# SCHÉMA DU JOURNAL (TYPES DÉCLARÉS + INSTANTANÉ COLONNAIRE)
+# ==========================================
+# Types compacts des colonnes : catégories pour les valeurs très répétées,
+# entiers nullables pour les notes / années (NA = pas encore noté / inconnue).
+SCHEMA = {
+    'date': 'datetime64[ns]',
+    'artiste': 'category',
+    'album': 'string',
+    'genre': 'category',
+    'tag': 'category',
+    'ecoute': 'bool',
+    'note': 'Int8',
+    'avis': 'string',
+    'deja_connu': 'bool',
+    'pays': 'category',
+    # Enrichissement iTunes (facultatif)
+    'cover': 'string',
+    'annee': 'Int16',
+    'itunes_id': 'Int64',
+}
+
+# Colonnes ajoutées au fil des versions, avec leur valeur par défaut
+COLONNES_PAR_DEFAUT = {
+    'ecoute': False,
+    'note': 0,
+    'avis': "",
+    'deja_connu': False,
+    'pays': "🌍"
+}
+
+EXTENSION_INSTANTANE = ".parquet"
+
+
+def typer(df):
+    """Applique le schéma à un journal brut (colonne 'date' + valeurs JSON) : une seule conversion."""
+    df = df.copy()
+    for col, defaut in COLONNES_PAR_DEFAUT.items():
+        if col not in df.columns:
+            df[col] = defaut
+    df['note'] = pd.to_numeric(df['note'], errors='coerce').where(lambda n: n > 0)
+    for col in ('ecoute', 'deja_connu'):
+        df[col] = df[col].astype('boolean').fillna(False)
+    df['avis'] = df['avis'].fillna("")
+    df['pays'] = df['pays'].fillna(COLONNES_PAR_DEFAUT['pays'])
+    for col in ('annee', 'itunes_id'):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    df['date'] = pd.to_datetime(df['date'])
+    colonnes = [c for c in SCHEMA if c in df.columns] + [c for c in df.columns if c not in SCHEMA]
+    return df[colonnes].astype({c: t for c, t in SCHEMA.items() if c in df.columns}).reset_index(drop=True)
+
+
+def vers_journal(df):
+    """Frame typé -> frame de travail de l'app (mêmes types que `stockage.normaliser`), sans nettoyage."""
+    df = df.copy()
+    df['date'] = df['date'].dt.strftime('%Y-%m-%d').astype(str)
+    df['note'] = df['note'].fillna(0).astype(int)
+    for col in ('artiste', 'album', 'genre', 'tag', 'pays', 'avis', 'cover'):
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    for col in ('annee', 'itunes_id'):
+        if col in df.columns:
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    df.index = pd.Index(df['date'].to_numpy())
+    return df
+
+
+def chemin_instantane(chemin_json):
+    """Instantané associé à un journal JSON : même nom, extension .parquet."""
+    return os.path.splitext(chemin_json)[0] + EXTENSION_INSTANTANE
+
+
+def empreinte(chemin_json):
+    """Empreinte du JSON source : un instantané n'est utilisé que s'il correspond au JSON présent."""
+    with open(chemin_json, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def ecrire_instantane(df, chemin_json):
+    """Écrit le frame typé en Parquet à côté du JSON (pyarrow est fourni avec Streamlit)."""
+    df = df.copy()
+    df.attrs['source'] = empreinte(chemin_json)
+    df.to_parquet(chemin_instantane(chemin_json), index=False, compression="zstd")
+
+
+def lire_instantane(chemin_json):
+    """Frame typé de l'instantané, ou None s'il est absent ou ne correspond plus au JSON (retouché à la main)."""
+    chemin = chemin_instantane(chemin_json)
+    if not os.path.exists(chemin):
+        return None
+    df = pd.read_parquet(chemin)
+    if os.path.exists(chemin_json) and df.attrs.get('source') != empreinte(chemin_json):
+        return None
+    return df
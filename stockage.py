@@ -0,0 +1,208 @@
+import json
+import pandas as pd
+
+import mesures
+from schema import COLONNES_PAR_DEFAUT, lire_instantane, vers_journal
+
+# ==========================================
+# FORMAT DU JOURNAL
+# ==========================================
+WORKSHEET = "Database"
+FICHIER_JSON = "journal_musical_ULTIMATE.json"
+
+
+
+def charger_json(chemin=FICHIER_JSON):
+    """Construit le DataFrame initial à partir du journal généré (une ligne par date)."""
+    with open(chemin, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return pd.DataFrame.from_dict(data, orient='index').reset_index().rename(columns={'index': 'date'})
+
+
+def charger_journal(chemin=FICHIER_JSON):
+    """Journal initial prêt à l'emploi : instantané Parquet typé s'il correspond au JSON, sinon JSON + nettoyage."""
+    df = lire_instantane(chemin)
+    if df is not None:
+        return vers_journal(df)
+    return normaliser(charger_json(chemin))[0]
+
+
+def normaliser(df):
+    """Crée les colonnes manquantes et nettoie les types.
+
+    Retourne (df, structure_modifiee) : le second élément indique qu'une colonne a été ajoutée
+    et que la feuille doit être réécrite entièrement. Le frame retourné est indexé par date.
+    """
+    if df.empty or 'date' not in df.columns:
+        return df, False
+
+    updated = False
+    for col, default_val in COLONNES_PAR_DEFAUT.items():
+        if col not in df.columns:
+            df[col] = default_val
+            updated = True
+
+    # Nettoyage strict des types (Anti-Bug Pandas)
+    df['ecoute'] = df['ecoute'].fillna(False).infer_objects(copy=False).astype(bool)
+    df['deja_connu'] = df['deja_connu'].fillna(False).infer_objects(copy=False).astype(bool)
+    df['note'] = pd.to_numeric(df['note'], errors='coerce').fillna(0).astype(int)
+
+    # Conversion texte sécurisée
+    df['avis'] = df['avis'].astype(str).replace(['nan', 'None'], '')
+    df['pays'] = df['pays'].astype(str).replace(['nan', 'None'], '🌍')
+    df['date'] = df['date'].astype(str)
+
+    # Index = date (unique, garanti par la copie locale) : accès direct df.at[date, col]
+    df.index = pd.Index(df['date'].to_numpy())
+    return df, updated
+
+
+# ==========================================
+# PERSISTANCE GOOGLE SHEETS (ÉCRITURES CIBLÉES)
+# ==========================================
+
+
+def _lettre_colonne(n):
+    """Convertit un numéro de colonne (1 = A) en lettres façon tableur."""
+    lettres = ""
+    while n > 0:
+        n, reste = divmod(n - 1, 26)
+        lettres = chr(65 + reste) + lettres
+    return lettres
+
+
+def valeur_cellule(valeur):
+    """Convertit une valeur pandas/numpy en valeur JSON acceptée par l'API Sheets."""
+    if pd.isna(valeur):
+        return ""
+    if hasattr(valeur, "item"):
+        valeur = valeur.item()  # numpy -> python natif
+    if isinstance(valeur, (bool, int, float)):
+        return valeur
+    return str(valeur)
+
+
+class JournalSheet:
+    """Suit les lignes lues dans la feuille (clé : date) et n'écrit que celles qui ont changé.
+
+    Une notation ne coûte qu'une plage d'une ligne au lieu de ré-uploader toute l'année.
+    Si la structure change (colonnes, lignes supprimées), on retombe sur une réécriture complète.
+    """
+
+    def __init__(self, conn, worksheet=WORKSHEET):
+        self._conn = conn     # Connexion, ou fonction qui la crée au premier accès (voir `conn`)
+        self.worksheet = worksheet
+        self._colonnes = []   # Ordre des colonnes dans la feuille
+        self._lignes = {}     # date -> numéro de ligne dans la feuille (1 = en-tête)
+        self._snapshot = {}   # date -> valeurs telles qu'écrites dans la feuille
+        self._ws = None       # Onglet gspread (ouvert une seule fois)
+
+    @property
+    def conn(self):
+        """Connexion st-gsheets ; ouverte seulement au premier accès si une fonction a été fournie."""
+        if not hasattr(self._conn, "read"):
+            self._conn = self._conn()
+        return self._conn
+
+    # --- LECTURE ---
+    @mesures.mesure("sheets.read")
+    def read(self, **kwargs):
+        return self.conn.read(worksheet=self.worksheet, **kwargs)
+
+    def remember(self, df):
+        """Mémorise l'état de la feuille correspondant à `df`.
+
+        `df` doit avoir le même ordre de lignes que la feuille (après lecture + nettoyage
+        des types, ou après une réécriture complète).
+        """
+        self._colonnes = list(df.columns)
+        self._lignes = {}
+        self._snapshot = {}
+        if 'date' not in df.columns:
+            return
+        i_date = self._colonnes.index('date')
+        for pos, ligne in enumerate(df.itertuples(index=False, name=None)):
+            valeurs = tuple(valeur_cellule(v) for v in ligne)
+            cle = str(valeurs[i_date])
+            if cle:
+                self._lignes[cle] = pos + 2
+                self._snapshot[cle] = valeurs
+
+    # --- DIFF ---
+    def changes(self, df):
+        """Retourne (lignes modifiées, lignes nouvelles) sous forme {date: valeurs}."""
+        modifiees, nouvelles = {}, {}
+        i_date = self._colonnes.index('date')
+        for ligne in df[self._colonnes].itertuples(index=False, name=None):
+            valeurs = tuple(valeur_cellule(v) for v in ligne)
+            cle = str(valeurs[i_date])
+            if cle not in self._snapshot:
+                nouvelles[cle] = valeurs
+            elif self._snapshot[cle] != valeurs:
+                modifiees[cle] = valeurs
+        return modifiees, nouvelles
+
+    def _structure_modifiee(self, df):
+        # Les colonnes dérivées ajoutées par l'interface (ex: dt_obj) sont ignorées
+        if 'date' not in self._colonnes or not set(self._colonnes).issubset(df.columns):
+            return True
+        dates = set(df['date'].astype(str))
+        return not set(self._snapshot).issubset(dates)
+
+    # --- ÉCRITURE ---
+    @mesures.mesure("sheets.write")
+    def write(self, df):
+        """Écrit uniquement les lignes modifiées/ajoutées. Retourne le nombre de lignes envoyées."""
+        if not self._colonnes or self._structure_modifiee(df):
+            return self.overwrite(df)
+
+        modifiees, nouvelles = self.changes(df)
+        if not modifiees and not nouvelles:
+            return 0
+
+        ws = self._worksheet()
+        if ws is None:
+            # Client sans accès gspread (feuille publique, tests) : réécriture complète
+            return self.overwrite(df[self._colonnes])
+
+        derniere_col = _lettre_colonne(len(self._colonnes))
+        if modifiees:
+            ws.batch_update([
+                {"range": f"A{self._lignes[cle]}:{derniere_col}{self._lignes[cle]}", "values": [list(valeurs)]}
+                for cle, valeurs in modifiees.items()
+            ], value_input_option="USER_ENTERED")
+        if nouvelles:
+            ws.append_rows([list(v) for v in nouvelles.values()], value_input_option="USER_ENTERED")
+            prochaine = max(self._lignes.values(), default=1) + 1
+            for i, cle in enumerate(nouvelles):
+                self._lignes[cle] = prochaine + i
+
+        self._snapshot.update(modifiees)
+        self._snapshot.update(nouvelles)
+        return len(modifiees) + len(nouvelles)
+
+    @mesures.mesure("sheets.overwrite")
+    def overwrite(self, df):
+        """Réécriture complète de la feuille (initialisation ou changement de structure)."""
+        self.conn.update(worksheet=self.worksheet, data=df)
+        self.remember(df)
+        return len(df)
+
+    def revision(self):
+        """Horodatage de dernière modification du classeur (sonde légère, API Drive).
+
+        Retourne None si le client ne permet pas de la connaître.
+        """
+        ws = self._worksheet()
+        if ws is None:
+            return None
+        return ws.spreadsheet.get_lastUpdateTime()
+
+    def _worksheet(self):
+        if self._ws is None:
+            client = getattr(self.conn, "client", None)
+            selection = getattr(client, "_select_worksheet", None)
+            if selection is None:
+                return None
+            self._ws = selection(worksheet=self.worksheet)
+        return self._ws
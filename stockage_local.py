@@ -0,0 +1,347 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+import mesures
+from stockage import normaliser, valeur_cellule
+
+# ==========================================
+# COPIE LOCALE SQLITE + SYNCHRO GOOGLE SHEETS
+# ==========================================
+DOSSIER_LOCAL = "donnees_locales"
+CHEMIN_DB = os.path.join(DOSSIER_LOCAL, "journal.sqlite")
+
+STRUCTURE = "*"  # Marqueur "réécriture complète" dans la file de synchro
+MIN_LIGNES_FEUILLE = 10  # En dessous, la feuille est considérée vide (initialisée avec le journal local)
+
+
+class ConflitEcriture(Exception):
+    """Des lignes ont changé (autre session, édition de la feuille) depuis qu'elles ont été lues."""
+
+    def __init__(self, dates):
+        super().__init__(f"Lignes modifiées entre-temps : {', '.join(dates)}")
+        self.dates = dates
+
+
+class JournalLocal:
+    """Copie SQLite du journal, source de vérité pour les lectures.
+
+    Les écritures vont dans SQLite immédiatement et sont notées dans la table `a_synchroniser`
+    (la file survit donc à un redémarrage). Un thread de fond pousse ces lignes vers la feuille
+    (via `JournalSheet`) : les écritures rapprochées (moins de `fenetre` secondes d'écart) sont
+    regroupées en un seul envoi, et un échec est retenté avec un délai exponentiel.
+    L'app reste utilisable si l'API Sheets est lente ou coupée ; `etat()` décrit la synchro.
+    Il sonde aussi la révision du classeur pour relire la feuille après une édition externe.
+
+    Chaque modification du contenu local incrémente `version()` (PRAGMA user_version),
+    qui sert de clé de cache côté app.
+
+    L'instance est partagée par toutes les sessions du processus : `instantane()` renvoie le même
+    frame (en lecture seule) à chacune, et chaque ligne porte une révision (table `revisions`)
+    pour les écritures conditionnelles de `modifier()` : une session qui n'a pas vu la dernière
+    modification d'une ligne ne peut plus l'écraser.
+    """
+
+    def __init__(self, sheet, chemin=CHEMIN_DB, intervalle=10, intervalle_sonde=60,
+                 fenetre=2.0, fenetre_max=10.0, delai_retry=2.0, delai_retry_max=300.0):
+        self.sheet = sheet
+        self.chemin = chemin
+        self.intervalle = intervalle
+        self.intervalle_sonde = intervalle_sonde
+        self.fenetre = fenetre                  # Calme attendu avant d'envoyer (regroupement)
+        self.fenetre_max = fenetre_max          # Attente maximale, même si les écritures continuent
+        self.delai_retry = delai_retry          # Premier délai après un échec, doublé ensuite
+        self.delai_retry_max = delai_retry_max
+        self.derniere_erreur = None
+        self.echecs = 0                         # Échecs consécutifs
+        self.prochain_essai = None              # Instant du prochain essai après un échec
+        self.derniere_synchro = None            # Instant du dernier envoi / relecture réussi
+        self.synchronise = False  # True une fois la feuille relue au moins une fois
+        self.provisoire = False   # Copie amorcée depuis le journal JSON, feuille pas encore lue (persisté)
+        self._revision = None     # Dernière révision connue du classeur
+        self._derniere_sonde = 0.0
+        self._verrou = threading.RLock()
+        self._reveil = threading.Event()
+        self._thread = None
+        self._instantane = None  # (df, version, structure_modifiee) partagé entre sessions
+
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        with self._connexion() as cx:
+            cx.execute("PRAGMA journal_mode=WAL")
+            cx.execute("CREATE TABLE IF NOT EXISTS a_synchroniser (date TEXT PRIMARY KEY, maj REAL)")
+            cx.execute("CREATE TABLE IF NOT EXISTS revisions (date TEXT PRIMARY KEY, rev INTEGER NOT NULL)")
+            cx.execute("CREATE TABLE IF NOT EXISTS etat (cle TEXT PRIMARY KEY, valeur TEXT)")
+            # Redémarrage avant la première lecture de la feuille : la copie reste provisoire
+            self.provisoire = cx.execute("SELECT 1 FROM etat WHERE cle = 'provisoire'").fetchone() is not None
+
+    def _connexion(self):
+        return sqlite3.connect(self.chemin, timeout=10, check_same_thread=False)
+
+    # --- LECTURES (locales) ---
+    @mesures.mesure("local.read")
+    def read(self):
+        with self._connexion() as cx:
+            existe = cx.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='journal'").fetchone()
+            if not existe:
+                return pd.DataFrame()
+            return pd.read_sql("SELECT * FROM journal ORDER BY rowid", cx)
+
+    def instantane(self):
+        """(df, version, structure_modifiee) de la version courante, construit une fois pour tout le processus.
+
+        Le frame est partagé par toutes les sessions : on ne le modifie jamais en place.
+        `df.attrs['revs']` donne la révision de chaque ligne (absente = 0), à passer à `modifier()`.
+        """
+        with self._verrou:
+            version = self.version()
+            if self._instantane is None or self._instantane[1] != version:
+                df, updated = normaliser(self.read())
+                df.attrs['revs'] = self.revisions()
+                self._instantane = (df, version, updated)
+            return self._instantane
+
+    def revisions(self):
+        with self._connexion() as cx:
+            return dict(cx.execute("SELECT date, rev FROM revisions").fetchall())
+
+    def version(self):
+        """Version du contenu local : change à chaque écriture ou adoption d'édition externe."""
+        with self._connexion() as cx:
+            return cx.execute("PRAGMA user_version").fetchone()[0]
+
+    def _incrementer_version(self, cx):
+        v = cx.execute("PRAGMA user_version").fetchone()[0]
+        cx.execute(f"PRAGMA user_version = {v + 1}")
+        return v + 1
+
+    def en_attente(self):
+        """Nombre de lignes pas encore poussées vers la feuille."""
+        with self._connexion() as cx:
+            return cx.execute("SELECT COUNT(*) FROM a_synchroniser").fetchone()[0]
+
+    def etat(self):
+        """État de la synchro pour l'interface."""
+        return {
+            "en_attente": self.en_attente(),
+            "erreur": str(self.derniere_erreur) if self.derniere_erreur else None,
+            "echecs": self.echecs,
+            "prochain_essai": self.prochain_essai,
+            "derniere_synchro": self.derniere_synchro,
+            "provisoire": self.provisoire,
+        }
+
+    # --- ÉCRITURES (locales, synchrones) ---
+    def amorcer(self, df):
+        """Copie provisoire (journal initial) affichée sans attendre la première lecture de la feuille.
+
+        Rien n'est mis en file : à la première `pull()` (thread de synchro), la feuille remplace
+        cette copie, ou est initialisée avec elle si elle est vide. Sans effet si la feuille,
+        lue entre-temps, a déjà rempli la copie locale.
+        """
+        with self._verrou:
+            if len(self.read()) >= MIN_LIGNES_FEUILLE:
+                return
+            # Feuille déjà lue (et vide) : elle est initialisée tout de suite avec ce journal
+            self.replace(df, synchroniser=self.synchronise, provisoire=not self.synchronise)
+        self._reveil.set()
+
+    def _noter_provisoire(self, cx, provisoire):
+        if provisoire:
+            cx.execute("INSERT OR REPLACE INTO etat VALUES ('provisoire', '1')")
+        else:
+            cx.execute("DELETE FROM etat WHERE cle = 'provisoire'")
+        self.provisoire = provisoire
+
+    def replace(self, df, synchroniser=True, provisoire=None):
+        """Remplace toute la copie locale (initialisation, nouvelle colonne).
+
+        `provisoire` (si donné) est enregistré dans la même transaction que les lignes.
+        """
+        with self._verrou, self._connexion() as cx:
+            if provisoire is not None:
+                self._noter_provisoire(cx, provisoire)
+            df.to_sql("journal", cx, if_exists="replace", index=False)
+            cx.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_journal_date ON journal(date)")
+            self._incrementer_version(cx)
+            if synchroniser:
+                cx.execute("INSERT OR REPLACE INTO a_synchroniser VALUES (?, ?)", (STRUCTURE, time.time()))
+        if synchroniser:
+            self._reveil.set()
+
+    def _lignes(self, df, colonnes):
+        """{date: valeurs} comparables (mêmes conversions que pour la feuille)."""
+        i_date = colonnes.index('date')
+        lignes = {}
+        for ligne in df[colonnes].itertuples(index=False, name=None):
+            valeurs = tuple(valeur_cellule(v) for v in ligne)
+            lignes[str(valeurs[i_date])] = valeurs
+        return lignes
+
+    @staticmethod
+    def _incrementer_revisions(cx, dates):
+        cx.executemany(
+            "INSERT INTO revisions VALUES (?, 1) ON CONFLICT(date) DO UPDATE SET rev = rev + 1",
+            [(d,) for d in dates]
+        )
+
+    @mesures.mesure("local.modifier")
+    def modifier(self, changements, revisions_lues):
+        """Écriture conditionnelle (compare-and-set) de quelques champs : {date: {colonne: valeur}}.
+
+        `revisions_lues` donne la révision de chaque ligne telle que la session l'a lue.
+        Si une ligne a changé depuis, rien n'est écrit et `ConflitEcriture` est levée.
+        Retourne (dates modifiées, version écrite) : la version précédente est `version - 1`.
+        """
+        dates = list(changements)
+        if not dates:
+            return [], self.version()
+        maintenant = time.time()
+        with self._verrou, self._connexion() as cx:
+            cx.execute("BEGIN IMMEDIATE")
+            trous = ", ".join("?" for _ in dates)
+            actuelles = dict(cx.execute(f"SELECT date, rev FROM revisions WHERE date IN ({trous})", dates).fetchall())
+            conflits = [d for d in dates if actuelles.get(d, 0) != revisions_lues.get(d, 0)]
+            if conflits:
+                raise ConflitEcriture(conflits)
+            for date, champs in changements.items():
+                affectations = ", ".join(f'"{c}" = ?' for c in champs)
+                cx.execute(
+                    f"UPDATE journal SET {affectations} WHERE date = ?",
+                    [valeur_cellule(v) for v in champs.values()] + [date]
+                )
+            self._incrementer_revisions(cx, dates)
+            cx.executemany("INSERT OR REPLACE INTO a_synchroniser VALUES (?, ?)", [(d, maintenant) for d in dates])
+            version = self._incrementer_version(cx)
+        self._reveil.set()
+        return dates, version
+
+    # --- SYNCHRO GOOGLE SHEETS ---
+    @mesures.mesure("local.pull")
+    def pull(self):
+        """Relit la feuille et adopte les modifications externes des lignes non en attente."""
+        df_sheet, updated = normaliser(self.sheet.read(ttl=0))
+        with self._verrou:
+            self.sheet.remember(df_sheet)
+            local = self.read()
+            with self._connexion() as cx:
+                attente = {d for (d,) in cx.execute("SELECT date FROM a_synchroniser")}
+
+            if self.provisoire:
+                initialiser = len(df_sheet) < MIN_LIGNES_FEUILLE and not local.empty
+                if not initialiser and not df_sheet.empty:
+                    self.replace(df_sheet, synchroniser=updated, provisoire=False)
+                with self._connexion() as cx:
+                    if initialiser:
+                        # Feuille vide : elle sera initialisée avec la copie amorcée
+                        cx.execute("INSERT OR REPLACE INTO a_synchroniser VALUES (?, ?)", (STRUCTURE, time.time()))
+                    self._noter_provisoire(cx, False)
+            elif local.empty or STRUCTURE in attente:
+                if local.empty and not df_sheet.empty:
+                    self.replace(df_sheet, synchroniser=updated)
+            else:
+                local = normaliser(local)[0].reset_index(drop=True)
+                garder = local[local['date'].isin(attente)]
+                fusion = pd.concat([
+                    df_sheet[~df_sheet['date'].isin(attente)],
+                    garder
+                ]).drop_duplicates('date', keep='last')
+                ordre = {d: i for i, d in enumerate(df_sheet['date'])}
+                fusion = fusion.sort_values('date', key=lambda s: s.map(ordre).fillna(len(ordre)), kind='stable')
+                fusion = fusion.reset_index(drop=True)
+                if updated or not fusion.equals(local):
+                    # Lignes éditées dans la feuille : nouvelle révision (les sessions qui les
+                    # avaient lues ne pourront plus les écraser sans les relire)
+                    colonnes = [c for c in local.columns if c in fusion.columns]
+                    avant = self._lignes(local, colonnes)
+                    changees = [d for d, v in self._lignes(fusion, colonnes).items() if avant.get(d) != v]
+                    self.replace(fusion, synchroniser=updated)
+                    with self._connexion() as cx:
+                        self._incrementer_revisions(cx, changees)
+            self.synchronise = True
+        return df_sheet
+
+    def _attendre_calme(self):
+        """Attend `fenetre` secondes sans nouvelle écriture (au plus `fenetre_max`) : une rafale
+        de clics donne un seul envoi."""
+        debut = time.time()
+        while True:
+            with self._connexion() as cx:
+                derniere = cx.execute("SELECT MAX(maj) FROM a_synchroniser").fetchone()[0]
+            if derniere is None:
+                return
+            attente = min(derniere + self.fenetre, debut + self.fenetre_max) - time.time()
+            if attente <= 0:
+                return
+            time.sleep(attente)
+
+    def _delai_apres_echec(self):
+        """Délai exponentiel (2 s, 4 s, 8 s... plafonné), avec un peu d'aléa."""
+        delai = min(self.delai_retry * 2 ** self.echecs, self.delai_retry_max)
+        return delai * random.uniform(0.8, 1.2)
+
+    def push(self):
+        """Pousse vers la feuille les lignes en attente. Lève une exception en cas d'échec."""
+        with self._connexion() as cx:
+            attente = dict(cx.execute("SELECT date, maj FROM a_synchroniser").fetchall())
+        if not attente:
+            return 0
+
+        df = normaliser(self.read())[0]
+        if STRUCTURE in attente:
+            envoyees = self.sheet.overwrite(df)
+        else:
+            envoyees = self.sheet.write(df)
+
+        # On ne retire que les entrées non modifiées pendant l'envoi
+        with self._verrou, self._connexion() as cx:
+            cx.executemany("DELETE FROM a_synchroniser WHERE date = ? AND maj = ?", list(attente.items()))
+        # Notre propre écriture change la révision : on la prend comme nouvelle référence
+        self._revision = self.sheet.revision()
+        return envoyees
+
+    def sonder(self):
+        """Relit la feuille si sa révision a changé depuis la dernière sonde (édition externe)."""
+        self._derniere_sonde = time.time()
+        revision = self.sheet.revision()
+        if revision is None:
+            return False
+        change = self._revision is not None and revision != self._revision
+        self._revision = revision
+        if change:
+            self.pull()
+        return change
+
+    def demarrer(self):
+        """Lance le thread de synchro (une seule fois par processus)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._boucle, name="synchro-sheets", daemon=True)
+            self._thread.start()
+
+    def _boucle(self):
+        while True:
+            try:
+                if not self.synchronise:
+                    self.pull()
+                    self._revision = self.sheet.revision()
+                self._attendre_calme()
+                self.push()
+                if time.time() - self._derniere_sonde >= self.intervalle_sonde:
+                    self.sonder()
+                self.echecs = 0
+                self.derniere_erreur = None
+                self.prochain_essai = None
+                self.derniere_synchro = time.time()
+            except Exception as e:
+                self.derniere_erreur = e
+                delai = self._delai_apres_echec()
+                self.echecs += 1
+                self.prochain_essai = time.time() + delai
+                time.sleep(delai)
+                continue
+            self._reveil.wait(timeout=self.intervalle)
+            self._reveil.clear()
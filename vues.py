@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+import caches
+
+# ==========================================
+# VUES DÉRIVÉES (CALCULS VECTORISÉS, MIS EN CACHE PAR VERSION)
+# ==========================================
+# Les fonctions cachées reçoivent le DataFrame en `_df` (non haché par Streamlit) :
+# la clé de cache est la version des données, plus la date du jour si besoin.
+
+# Statut d'un album -> (couleur, icône) dans le calendrier
+STYLES_STATUT = {
+    "classique": ("#17a2b8", "🔄"),   # Bleu
+    "decouverte": ("#28a745", "✅"),  # Vert
+    "en_retard": ("#dc3545", "⚠️"),   # Rouge
+    "a_venir": ("#6c757d", "🎵"),     # Gris
+}
+
+
+def statuts(df, aujourd_hui):
+    """Statut de chaque ligne (classique / decouverte / en_retard / a_venir), sans boucle."""
+    ecoute = df['ecoute'].to_numpy(dtype=bool)
+    connu = df['deja_connu'].to_numpy(dtype=bool)
+    passe = (df['date'].astype(str) < str(aujourd_hui)).to_numpy()
+    return pd.Series(
+        np.select(
+            [ecoute & connu, ecoute & ~connu, passe],
+            ["classique", "decouverte", "en_retard"],
+            default="a_venir"
+        ),
+        index=df.index
+    )
+
+
+@caches.region(caches.VUES, max_entries=4, show_spinner=False)
+def evenements_calendrier(_df, version, aujourd_hui):
+    """Événements FullCalendar pour tout le journal, construits en une passe."""
+    statut = statuts(_df, aujourd_hui)
+    couleurs = statut.map({s: style[0] for s, style in STYLES_STATUT.items()})
+    icones = statut.map({s: style[1] for s, style in STYLES_STATUT.items()})
+    return pd.DataFrame({
+        "title": icones + " " + _df['pays'].astype(str) + " " + _df['artiste'].astype(str),
+        "start": _df['date'].astype(str),
+        "allDay": True,
+        "backgroundColor": couleurs,
+        "borderColor": couleurs,
+    }).to_dict('records')
+
+
+@caches.region(caches.VUES, max_entries=2, show_spinner=False)
+def galerie_par_mois(_df, version):
+    """Lignes du journal groupées par mois en un seul groupby : [(cle 'AAAA-MM', libellé, df_mois)]."""
+    colonnes = ['date', 'artiste', 'album', 'pays', 'ecoute', 'deja_connu']
+    colonnes += [c for c in ('cover', 'annee') if c in _df.columns]
+    mois = pd.to_datetime(_df['date']).dt.to_period('M')
+    return [
+        (str(periode), periode.strftime('%B %Y').capitalize(), groupe[colonnes].sort_values('date'))
+        for periode, groupe in _df.groupby(mois, sort=True)
+    ]
+
+
+# ==========================================
+# STATISTIQUES (GROUPBY / PIVOT, MIS EN CACHE PAR VERSION)
+# ==========================================
+# Dimensions proposées dans l'onglet Statistiques : libellé -> colonne du journal
+DIMENSIONS = {
+    "Genre": "genre",
+    "Tag": "tag",
+    "Pays": "pays",
+    "Artiste": "artiste",
+}
+NOTES = range(1, 6)
+
+
+def _indicateurs(df):
+    """Colonnes 0/1 et notes (NaN si non noté) agrégeables par simple somme / moyenne."""
+    ecoute = df['ecoute'].to_numpy(dtype=bool)
+    note = pd.to_numeric(df['note'], errors='coerce').to_numpy(dtype=float)
+    return pd.DataFrame({
+        'ecoute': ecoute,
+        'decouverte': ecoute & ~df['deja_connu'].to_numpy(dtype=bool),
+        'note': np.where(ecoute & (note > 0), note, np.nan),
+    }, index=df.index)
+
+
+@caches.region(caches.VUES, max_entries=8, show_spinner=False)
+def stats_par(_df, version, colonne):
+    """Par valeur de `colonne` : albums prévus, écoutés, note moyenne et part de découvertes.
+
+    Trié par nombre d'écoutes puis note moyenne (une ligne par valeur, même jamais écoutée).
+    """
+    ind = _indicateurs(_df)
+    stats = ind.groupby(_df[colonne].astype(str), sort=False).agg(
+        albums=('ecoute', 'size'),
+        ecoutes=('ecoute', 'sum'),
+        decouvertes=('decouverte', 'sum'),
+        note_moyenne=('note', 'mean'),
+    )
+    stats['part_decouvertes'] = stats['decouvertes'] / stats['ecoutes'].where(stats['ecoutes'] > 0)
+    stats.index.name = colonne
+    return stats.sort_values(['ecoutes', 'note_moyenne'], ascending=False)
+
+
+@caches.region(caches.VUES, max_entries=4, show_spinner=False)
+def progression_mensuelle(_df, version, aujourd_hui):
+    """Par mois : albums prévus / écoutés, cumuls, et retard en fin de mois.
+
+    Le retard d'un mois est le nombre d'albums passés (jusqu'à la fin du mois, sans dépasser
+    aujourd'hui) toujours pas écoutés : sa courbe montre si le retard se résorbe.
+    """
+    ind = _indicateurs(_df)
+    mois = pd.to_datetime(_df['date']).dt.to_period('M')
+    passe = (_df['date'].astype(str) < str(aujourd_hui)).to_numpy()
+    ind['prevus'] = 1
+    ind['en_retard'] = passe & ~ind['ecoute'].to_numpy()
+    progression = ind.groupby(mois, sort=True)[['prevus', 'ecoute', 'en_retard']].sum()
+    progression = progression.rename(columns={'ecoute': 'ecoutes'})
+    progression['ecoutes_cumul'] = progression['ecoutes'].cumsum()
+    progression['prevus_cumul'] = progression['prevus'].cumsum()
+    progression['retard'] = progression.pop('en_retard').cumsum()
+    # Mois à venir : pas encore de retard à afficher
+    progression.loc[progression.index > pd.Period(str(aujourd_hui), 'M'), 'retard'] = np.nan
+    progression.index = progression.index.to_timestamp().rename('mois')
+    return progression
+
+
+@caches.region(caches.VUES, max_entries=2, show_spinner=False)
+def distribution_notes(_df, version):
+    """Nombre d'albums écoutés par note (1 à 5), en colonnes : découvertes / classiques."""
+    ecoutes = _df[_df['ecoute'].to_numpy(dtype=bool) & (_df['note'] > 0)]
+    categorie = np.where(ecoutes['deja_connu'].to_numpy(dtype=bool), "Classiques", "Découvertes")
+    distribution = pd.crosstab(ecoutes['note'], categorie, colnames=[None])
+    return distribution.reindex(index=NOTES, columns=["Découvertes", "Classiques"], fill_value=0)